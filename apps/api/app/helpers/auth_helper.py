@@ -1,15 +1,46 @@
-from fastapi import HTTPException, status, Depends
-from fastapi.security import OAuth2PasswordBearer
-from google.oauth2 import id_token
-from google.auth.transport import requests as google_requests
+import hashlib
+import hmac
+import logging
+from typing import Any, Mapping, Optional
+
+from fastapi import HTTPException, Request, status, Depends
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer, OAuth2PasswordBearer
 from google.auth.exceptions import GoogleAuthError
+from app.helpers.cache_helper import TTLCache
+from app.helpers.jwks_helper import JWKSVerifier, jwks_source_from_uri
 from settings import settings
 
+logger = logging.getLogger(__name__)
+
 # Google Client ID from settings
 GOOGLE_CLIENT_ID = settings.google_client_id
+GOOGLE_ISSUERS = ("accounts.google.com", "https://accounts.google.com")
 
 # OAuth2PasswordBearer to extract the Bearer token from the Authorization header
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
+# Bearer token of the metrics endpoints, compared with settings.metrics_token
+metrics_bearer = HTTPBearer(auto_error=False)
+
+# Google signing keys, loaded and refreshed in the background from lifespan_setup
+jwks_verifier = JWKSVerifier(
+    jwks_source_from_uri(settings.auth_jwks_uri),
+    audience=GOOGLE_CLIENT_ID,
+    issuers=GOOGLE_ISSUERS,
+    refresh_interval=settings.auth_jwks_refresh_interval,
+)
+# Verified tokens keyed by sha256 of the raw token, expiring at the token's `exp`
+token_cache: TTLCache[str, str] = TTLCache(max_size=settings.auth_token_cache_size)
+
+
+def verify_google_token(token: str) -> Mapping[str, Any]:
+    """
+    Verify a Google ID token against the in-memory Google JWKS.
+
+    Raises:
+        ValueError: If the signature or any of the claims is invalid
+    """
+    return jwks_verifier.verify(token)
+
 
 async def get_current_user_email(token: str = Depends(oauth2_scheme)) -> str:
     """
@@ -24,14 +55,16 @@ async def get_current_user_email(token: str = Depends(oauth2_scheme)) -> str:
     Raises:
         HTTPException: If the token is invalid or verification fails
     """
-    # print("Verifying token:", token)
+    token_key = hashlib.sha256(token.encode("utf-8")).hexdigest()
+    email = token_cache.get(token_key)
+    if email is not None:
+        return email
+
     try:
         # Verify the Google ID token
-        idinfo = id_token.verify_oauth2_token(
-            token, google_requests.Request(), GOOGLE_CLIENT_ID
-        )
+        idinfo = verify_google_token(token)
 
-        print("Token verified. ID info:", idinfo)
+        logger.debug("Token verified", extra={"sub": idinfo.get("sub"), "exp": idinfo.get("exp")})
         
         # Ensure the token has the required email claim
         if 'email' not in idinfo:
@@ -51,7 +84,8 @@ async def get_current_user_email(token: str = Depends(oauth2_scheme)) -> str:
                 detail="Email not verified by Google",
                 headers={"WWW-Authenticate": "Bearer"},
             )
-        
+
+        token_cache.set(token_key, email, expires_at=idinfo["exp"])
         return email
 
     except ValueError as e:
@@ -75,3 +109,61 @@ async def get_current_user_email(token: str = Depends(oauth2_scheme)) -> str:
             detail="Authentication failed",
             headers={"WWW-Authenticate": "Bearer"},
         )
+
+
+async def get_session_user_email(request: Request, email: str = Depends(get_current_user_email)) -> str:
+    """
+    Verify the Google ID token like get_current_user_email, and key the request's
+    database sessions on the user, so that they read their own writes when read
+    replicas are used (see db.main.get_session_key).
+
+    Must be resolved before the session dependencies, i.e. declared ahead of them.
+
+    Args:
+        request: The current request
+        email: The user's email address
+
+    Returns:
+        str: The user's email address
+    """
+    request.state.db_session_key = email
+    return email
+
+
+async def get_email_from_authorization(authorization: Optional[str]) -> Optional[str]:
+    """
+    Email of the user of a bearer token, for code running before the route dependencies.
+
+    Args:
+        authorization: Value of the Authorization header, if any
+
+    Returns:
+        Optional[str]: The user's email address, None if the header is missing or the token is invalid
+    """
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        return await get_current_user_email(token)
+    except HTTPException:
+        return None
+
+
+async def verify_metrics_token(credentials: Optional[HTTPAuthorizationCredentials] = Depends(metrics_bearer)) -> None:
+    """
+    Let only holders of the metrics token through.
+
+    Args:
+        credentials: The bearer token from the Authorization header, if any
+
+    Raises:
+        HTTPException: 404 if no metrics token is configured, 401 if the token is missing or wrong
+    """
+    if not settings.metrics_token:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if credentials is None or not hmac.compare_digest(credentials.credentials.encode("utf-8"), settings.metrics_token.encode("utf-8")):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid metrics token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
@@ -0,0 +1,69 @@
+import time
+from collections import OrderedDict
+from typing import Generic, Hashable, Optional, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class TTLCache(Generic[K, V]):
+    """
+    Bounded in-process LRU cache with a per-entry expiry.
+
+    Entries are dropped lazily when they are read after their expiry time,
+    and the least recently used entry is evicted once ``max_size`` is reached.
+    Not thread-safe; it is meant to be used from the event loop only.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: Optional[float] = None):
+        """
+        :param max_size: maximum number of entries kept in the cache.
+        :param ttl: default time-to-live in seconds, None means no expiry.
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data: "OrderedDict[K, tuple[V, Optional[float]]]" = OrderedDict()
+
+    def get(self, key: K) -> Optional[V]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.time():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: K, value: V, expires_at: Optional[float] = None) -> None:
+        """
+        Store a value.
+        :param key: cache key.
+        :param value: value to store.
+        :param expires_at: absolute unix timestamp of expiry,
+            defaults to now + ttl.
+        """
+        if expires_at is None and self.ttl is not None:
+            expires_at = time.time() + self.ttl
+        self._data[key] = (value, expires_at)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+
+    def incr(self, key: K, delta: int = 1) -> None:
+        """Adjust a cached counter in place, keeping its expiry. No-op if the key is not cached."""
+        entry = self._data.get(key)
+        if entry is None:
+            return
+        value, expires_at = entry
+        self._data[key] = (value + delta, expires_at)
+
+    def pop(self, key: K) -> Optional[V]:
+        entry = self._data.pop(key, None)
+        return entry[0] if entry is not None else None
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
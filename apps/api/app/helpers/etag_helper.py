@@ -0,0 +1,53 @@
+import hashlib
+import itertools
+import time
+from typing import Any, Dict, Optional
+
+from fastapi import Request, Response, status
+
+# Generation values are unique for the life of the process and start from the clock,
+# so a restarted worker does not hand out values seen before the restart
+_generation_values = itertools.count(time.time_ns())
+
+
+def next_generation() -> int:
+    """A generation value never handed out before by this process."""
+    return next(_generation_values)
+
+
+def make_etag(*parts: Any) -> str:
+    """Strong ETag for a response built from the given version parts."""
+    digest = hashlib.sha256(repr(parts).encode("utf-8")).hexdigest()[:32]
+    return f'"{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Whether an If-None-Match header matches the ETag.
+    Uses the weak comparison RFC 9110 prescribes for If-None-Match.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (candidate.strip() for candidate in if_none_match.split(","))
+    return etag in (candidate[2:] if candidate.startswith("W/") else candidate for candidate in candidates)
+
+
+def etag_headers(etag: Optional[str]) -> Dict[str, str]:
+    """Validator headers for a response with the given ETag; clients must revalidate before reuse."""
+    if etag is None:
+        return {}
+    return {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+
+def not_modified_response(request: Request, etag: Optional[str]) -> Optional[Response]:
+    """
+    Handle a conditional GET.
+    :param request: the incoming request.
+    :param etag: current ETag of the resource, None skips conditional handling.
+    :return: a 304 response if the client's copy is current, else None.
+    """
+    if etag is None or not etag_matches(request.headers.get("If-None-Match"), etag):
+        return None
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=etag_headers(etag))
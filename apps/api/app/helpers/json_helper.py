@@ -0,0 +1,45 @@
+import json
+from functools import lru_cache
+from typing import Any, Mapping, Optional
+
+from fastapi import Response, status
+from pydantic import BaseModel, TypeAdapter
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+
+@lru_cache(maxsize=None)
+def type_adapter(type_: Any) -> TypeAdapter:
+    """Shared TypeAdapter for a type; building one compiles a validator and a serializer."""
+    return TypeAdapter(type_)
+
+
+def dump_json(value: Any, type_: Any = None) -> bytes:
+    """
+    Serialize a value to JSON bytes in a single pass.
+    Pydantic models (or values of `type_`) are serialized by pydantic-core,
+    other data by orjson when it is installed, else by the stdlib.
+    """
+    if type_ is not None:
+        return type_adapter(type_).dump_json(value)
+    if isinstance(value, BaseModel):
+        return value.__pydantic_serializer__.to_json(value)
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def json_response(
+    value: Any,
+    type_: Any = None,
+    status_code: int = status.HTTP_200_OK,
+    headers: Optional[Mapping[str, str]] = None,
+) -> Response:
+    """
+    Pre-serialized JSON response, bypassing FastAPI's jsonable_encoder.
+    Pass the route's `response_model` too, so the OpenAPI schema stays documented.
+    """
+    return Response(content=dump_json(value, type_), status_code=status_code, headers=headers, media_type="application/json")
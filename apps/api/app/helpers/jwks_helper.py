@@ -0,0 +1,235 @@
+import asyncio
+import base64
+import json
+import logging
+import re
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Dict, Iterable, Mapping, Optional, Tuple, Union
+
+import httpx
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.asymmetric import padding
+from cryptography.hazmat.primitives.asymmetric.rsa import RSAPublicKey, RSAPublicNumbers
+
+logger = logging.getLogger(__name__)
+
+_MAX_AGE_RE = re.compile(r"max-age=(\d+)")
+
+# Never hit the key source more often than this, even on unknown `kid`s
+MIN_REFRESH_INTERVAL = 60
+
+
+def _b64url_decode(value: str) -> bytes:
+    return base64.urlsafe_b64decode(value + "=" * (-len(value) % 4))
+
+
+def _b64url_to_int(value: str) -> int:
+    return int.from_bytes(_b64url_decode(value), "big")
+
+
+class JWKSSource(ABC):
+    """Where the JSON Web Key Set is loaded from."""
+
+    @abstractmethod
+    async def load(self) -> Tuple[Mapping[str, Any], Optional[int]]:
+        """
+        Load the key set.
+        :return: the JWKS document and its max-age in seconds, if known.
+        """
+
+
+class UrlJWKSSource(JWKSSource):
+    """JWKS served over HTTP, honoring the response's Cache-Control max-age."""
+
+    def __init__(self, url: str, timeout: float = 10.0):
+        self.url = url
+        self.timeout = timeout
+
+    async def load(self) -> Tuple[Mapping[str, Any], Optional[int]]:
+        async with httpx.AsyncClient(timeout=self.timeout) as client:
+            response = await client.get(self.url)
+        response.raise_for_status()
+        match = _MAX_AGE_RE.search(response.headers.get("Cache-Control", ""))
+        return response.json(), int(match.group(1)) if match else None
+
+
+class FileJWKSSource(JWKSSource):
+    """JWKS stored in a local JSON file."""
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+
+    async def load(self) -> Tuple[Mapping[str, Any], Optional[int]]:
+        content = await asyncio.to_thread(self.path.read_text, encoding="utf-8")
+        return json.loads(content), None
+
+
+class StaticJWKSSource(JWKSSource):
+    """In-process JWKS, e.g. a fixture key set for offline load tests."""
+
+    def __init__(self, jwks: Mapping[str, Any]):
+        self.jwks = jwks
+
+    async def load(self) -> Tuple[Mapping[str, Any], Optional[int]]:
+        return self.jwks, None
+
+
+def jwks_source_from_uri(uri: str) -> JWKSSource:
+    """
+    Build a key source from a configuration value.
+    :param uri: http(s) URL, file:// URL or a plain file path.
+    """
+    if uri.startswith(("http://", "https://")):
+        return UrlJWKSSource(uri)
+    if uri.startswith("file://"):
+        return FileJWKSSource(uri[len("file://"):])
+    return FileJWKSSource(uri)
+
+
+class JWKSVerifier:
+    """
+    RS256 JWT verification against an in-memory JWKS.
+
+    Verification itself is CPU-only; the key set is loaded by `start()` and
+    then kept fresh by a background asyncio task.
+    """
+
+    def __init__(
+        self,
+        source: JWKSSource,
+        audience: Optional[str] = None,
+        issuers: Iterable[str] = (),
+        refresh_interval: int = 3600,
+        leeway: int = 0,
+    ):
+        """
+        :param source: where to load the key set from.
+        :param audience: expected `aud` claim, None disables the check.
+        :param issuers: accepted `iss` claims, empty accepts any issuer.
+        :param refresh_interval: seconds between refreshes when the source gives no max-age.
+        :param leeway: allowed clock skew in seconds for `exp`/`iat`/`nbf`.
+        """
+        self.source = source
+        self.audience = audience
+        self.issuers = tuple(issuers)
+        self.refresh_interval = refresh_interval
+        self.leeway = leeway
+        self._keys: Dict[str, RSAPublicKey] = {}
+        self._next_refresh = 0.0
+        self._last_refresh = 0.0
+        self._refresh_requested = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def is_loaded(self) -> bool:
+        return bool(self._keys)
+
+    async def refresh(self) -> None:
+        """Reload the key set from the source."""
+        jwks, max_age = await self.source.load()
+        keys: Dict[str, RSAPublicKey] = {}
+        for jwk in jwks.get("keys", []):
+            if jwk.get("kty") != "RSA" or jwk.get("use", "sig") != "sig":
+                continue
+            if jwk.get("alg", "RS256") != "RS256":
+                continue
+            keys[jwk.get("kid", "")] = RSAPublicNumbers(
+                _b64url_to_int(jwk["e"]), _b64url_to_int(jwk["n"])
+            ).public_key()
+        self._keys = keys
+        self._last_refresh = time.time()
+        interval = max_age if max_age is not None else self.refresh_interval
+        self._next_refresh = self._last_refresh + max(interval, MIN_REFRESH_INTERVAL)
+
+    async def start(self) -> None:
+        """Load the key set and start refreshing it in the background."""
+        try:
+            await self.refresh()
+        except Exception:
+            logger.exception("Initial JWKS load failed, retrying in background")
+            self._next_refresh = time.time() + MIN_REFRESH_INTERVAL
+        self._task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            delay = max(self._next_refresh - time.time(), 0)
+            try:
+                await asyncio.wait_for(self._refresh_requested.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+            self._refresh_requested.clear()
+            # Early refreshes (unknown kid) are throttled
+            wait = self._last_refresh + MIN_REFRESH_INTERVAL - time.time()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            try:
+                await self.refresh()
+            except Exception:
+                logger.exception("JWKS refresh failed")
+                self._next_refresh = time.time() + MIN_REFRESH_INTERVAL
+
+    def verify(self, token: str) -> Mapping[str, Any]:
+        """
+        Verify a token signature and its standard claims.
+        :param token: compact-serialized JWT.
+        :return: the token claims.
+        :raises ValueError: if the token is malformed, badly signed or invalid.
+        """
+        try:
+            encoded_header, encoded_payload, encoded_signature = token.split(".")
+            header = json.loads(_b64url_decode(encoded_header))
+            signature = _b64url_decode(encoded_signature)
+        except (ValueError, TypeError) as e:
+            raise ValueError(f"Malformed token: {e}") from e
+
+        if header.get("alg") != "RS256":
+            raise ValueError(f"Unsupported token algorithm: {header.get('alg')}")
+        key = self._keys.get(header.get("kid", ""))
+        if key is None:
+            self._refresh_requested.set()
+            raise ValueError("Unknown token signing key")
+        try:
+            key.verify(
+                signature,
+                f"{encoded_header}.{encoded_payload}".encode("ascii"),
+                padding.PKCS1v15(),
+                hashes.SHA256(),
+            )
+        except InvalidSignature as e:
+            raise ValueError("Could not verify token signature.") from e
+
+        claims = json.loads(_b64url_decode(encoded_payload))
+        self._check_claims(claims)
+        return claims
+
+    def _check_claims(self, claims: Mapping[str, Any]) -> None:
+        now = time.time()
+        if "exp" not in claims:
+            raise ValueError("Token has no exp claim")
+        if now > claims["exp"] + self.leeway:
+            raise ValueError("Token expired")
+        if "iat" in claims and now < claims["iat"] - self.leeway:
+            raise ValueError("Token used too early")
+        if "nbf" in claims and now < claims["nbf"] - self.leeway:
+            raise ValueError("Token not yet valid")
+        if self.audience is not None:
+            audiences = claims.get("aud")
+            if isinstance(audiences, str):
+                audiences = [audiences]
+            if self.audience not in (audiences or []):
+                raise ValueError("Token has wrong audience")
+        if self.issuers and claims.get("iss") not in self.issuers:
+            raise ValueError(f"Wrong issuer. 'iss' should be one of the following: {self.issuers}")
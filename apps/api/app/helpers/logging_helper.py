@@ -0,0 +1,99 @@
+import copy
+import json
+import logging
+import queue
+import random
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Optional, Union
+
+# Attributes every LogRecord has; anything else was passed through `extra=` and is logged as a field
+_RECORD_ATTRIBUTES = frozenset(vars(logging.LogRecord("", logging.INFO, "", 0, "", None, None))) | {"message", "asctime"}
+
+# Libraries that log every single operation at DEBUG; they stay at INFO even when the app runs at DEBUG.
+# SQLAlchemy names a pool's logger after the pool class, so our instrumented pool logs as `db.pool`.
+NOISY_LOGGERS = ("aiosqlite", "httpcore", "db.pool")
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line: timestamp, level, logger, message, `extra` fields and the traceback if any."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload: Dict[str, Any] = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES:
+                payload[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            payload["exc"] = record.exc_text
+        return json.dumps(payload, default=str, ensure_ascii=False)
+
+
+class DebugSamplingFilter(logging.Filter):
+    """Keeps only a fraction of DEBUG records; records of higher levels always pass."""
+
+    def __init__(self, rate: float):
+        """
+        :param rate: fraction of DEBUG records to keep, between 0 and 1.
+        """
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno > logging.DEBUG or self.rate >= 1 or random.random() < self.rate
+
+
+class _StructuredQueueHandler(QueueHandler):
+    """
+    QueueHandler that keeps records structured.
+
+    The stock `prepare` renders the record with a plain formatter before enqueueing;
+    here only the message and traceback are rendered (args may not be safe to use
+    from another thread), and formatting is left to the listener's handlers.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def setup_logging(level: Union[str, int], debug_sample_rate: float = 1.0) -> QueueListener:
+    """
+    Route all logging through a queue to a background thread that writes JSON lines to stdout,
+    so request handlers never block on log I/O.
+    :param level: root log level.
+    :param debug_sample_rate: fraction of DEBUG records to keep.
+    :return: the started listener; call `stop()` on shutdown to flush it.
+    """
+    log_queue: "queue.SimpleQueue[Optional[logging.LogRecord]]" = queue.SimpleQueue()
+    queue_handler = _StructuredQueueHandler(log_queue)
+    # Sampled out records are dropped before they reach the queue
+    queue_handler.addFilter(DebugSamplingFilter(debug_sample_rate))
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(JSONFormatter())
+
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+    for name in NOISY_LOGGERS:
+        logging.getLogger(name).setLevel(max(logging.getLogger().getEffectiveLevel(), logging.INFO))
+
+    listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    listener.start()
+    return listener
@@ -0,0 +1,70 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import Column, DateTime, and_, literal, or_, tuple_
+from sqlalchemy.sql.elements import ColumnElement
+
+
+def order_by_keyset(column: Column, id_column: Column, descending: bool) -> Tuple[ColumnElement, ...]:
+    """
+    Deterministic ordering for keyset pagination: the sort column, then the id as a tie-breaker.
+    NULLs of a nullable sort column come first in ascending order, last in descending order.
+    """
+    if descending:
+        sort_key = column.desc().nulls_last() if column.nullable else column.desc()
+        return sort_key, id_column.desc()
+    sort_key = column.asc().nulls_first() if column.nullable else column.asc()
+    return sort_key, id_column.asc()
+
+
+def seek_predicate(column: Column, id_column: Column, value: Any, last_id: int, descending: bool) -> ColumnElement:
+    """Rows strictly after (value, last_id) in the order given by `order_by_keyset`."""
+    if value is not None:
+        value = literal(value, column.type)
+    if descending:
+        if value is None:
+            return and_(column.is_(None), id_column < last_id)
+        # Row-value comparison so the (column, id) index can be range-scanned
+        predicate = tuple_(column, id_column) < tuple_(value, last_id)
+        return or_(predicate, column.is_(None)) if column.nullable else predicate
+    if value is None:
+        return or_(and_(column.is_(None), id_column > last_id), column.is_not(None))
+    return tuple_(column, id_column) > tuple_(value, last_id)
+
+
+def encode_cursor(sort_by: str, order: str, value: Any, last_id: int) -> str:
+    """Opaque cursor pointing right after the row with the given sort value and id."""
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    payload = json.dumps({"k": sort_by, "o": order, "v": value, "id": last_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, column: Column, sort_by: str, order: str) -> Tuple[Any, int]:
+    """
+    Decode a cursor produced by `encode_cursor`.
+    :return: the sort value and id of the last row of the previous page.
+    :raises HTTPException: if the cursor is malformed or was issued for another sort.
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        value, last_id = payload["v"], int(payload["id"])
+        if value is not None and isinstance(column.type, DateTime):
+            value = datetime.fromisoformat(value)
+    except (binascii.Error, ValueError, TypeError, KeyError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    if payload.get("k") != sort_by or payload.get("o") != order:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cursor does not match sort parameters")
+    return value, last_id
+
+
+def next_cursor(rows: list, limit: Optional[int], sort_by: str, order: str) -> Optional[str]:
+    """Cursor for the page after `rows`, or None when `rows` is the last page (fetched with limit + 1)."""
+    if not limit or len(rows) <= limit:
+        return None
+    last = rows[limit - 1]
+    return encode_cursor(sort_by, order, getattr(last, sort_by), last.id)
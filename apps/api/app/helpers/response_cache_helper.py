@@ -0,0 +1,175 @@
+import logging
+from abc import ABC, abstractmethod
+from typing import Hashable, Optional
+
+from app.helpers.cache_helper import TTLCache
+from app.helpers.etag_helper import next_generation
+
+try:
+    import redis.asyncio as redis
+except ImportError:  # pragma: no cover - redis is optional
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+
+class ResponseCache(ABC):
+    """
+    Cache of serialized responses, grouped in scopes (e.g. one per user) that are invalidated as a whole.
+
+    Every scope has a generation that is part of the keys of its entries. Invalidating a
+    scope moves it to a new generation, so its old entries are never looked up again and
+    simply age out; no keys have to be found or deleted. A scope whose generation is not
+    known (never seen, or evicted) starts from a fresh value, never from one used before.
+    """
+
+    async def key(self, scope: Hashable, part: str) -> str:
+        """
+        Cache key of one response in a scope.
+        Read it before loading the data to cache, so a concurrent invalidation is not missed.
+        :param scope: the scope, e.g. a user id.
+        :param part: identifies the response within the scope, e.g. a digest of its parameters.
+        """
+        return f"{scope}:{await self.generation(scope)}:{part}"
+
+    @abstractmethod
+    async def generation(self, scope: Hashable) -> int:
+        """Current generation of a scope."""
+
+    @abstractmethod
+    async def invalidate(self, scope: Hashable) -> None:
+        """Move a scope to a new generation, dropping its cached responses."""
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[bytes]:
+        """Cached response, None on a miss."""
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes) -> None:
+        """Cache a response under a key from `key`."""
+
+    async def close(self) -> None:
+        pass
+
+
+class MemoryResponseCache(ResponseCache):
+    """
+    In-process LRU backend. Every worker process has its own, so invalidations made by
+    one worker are not seen by the others; use RedisResponseCache when running several.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: Optional[float] = None, max_scopes: int = 4096):
+        """
+        :param max_size: maximum number of cached responses.
+        :param ttl: seconds a response is kept, None means until evicted.
+        :param max_scopes: maximum number of scope generations tracked.
+        """
+        self._entries: TTLCache[str, bytes] = TTLCache(max_size=max_size, ttl=ttl)
+        self._generations: TTLCache[Hashable, int] = TTLCache(max_size=max_scopes)
+
+    async def generation(self, scope: Hashable) -> int:
+        generation = self._generations.get(scope)
+        if generation is None:
+            generation = next_generation()
+            self._generations.set(scope, generation)
+        return generation
+
+    async def invalidate(self, scope: Hashable) -> None:
+        self._generations.set(scope, next_generation())
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return self._entries.get(key)
+
+    async def set(self, key: str, value: bytes) -> None:
+        self._entries.set(key, value)
+
+
+class RedisResponseCache(ResponseCache):
+    """
+    Backend on a Redis-protocol server, shared by all workers.
+
+    Generations are counters on the server, bumped with INCR. Server errors are logged
+    and make lookups miss, so the API keeps working, uncached, while the server is down.
+    """
+
+    def __init__(self, url: str, ttl: Optional[float] = None, prefix: str = "np-orders:"):
+        """
+        :param url: server URL, e.g. redis://localhost:6379/0.
+        :param ttl: seconds a response is kept, None means until the server evicts it.
+        :param prefix: prepended to every key, to share a server with other applications.
+        """
+        if redis is None:
+            raise RuntimeError("The redis package is required for a Redis response cache: poetry install -E redis")
+        self._client = redis.Redis.from_url(url)
+        self.ttl = int(ttl) if ttl else None
+        self.prefix = prefix
+
+    async def generation(self, scope: Hashable) -> int:
+        generation_key = f"{self.prefix}generation:{scope}"
+        try:
+            generation = await self._client.get(generation_key)
+            if generation is None:
+                # SET NX: of concurrent first readers, only one picks the starting value
+                await self._client.set(generation_key, next_generation(), nx=True)
+                generation = await self._client.get(generation_key)
+            return int(generation)
+        except redis.RedisError as e:
+            logger.warning("Response cache unavailable: %s", e)
+            # A value no entry was ever stored under: the lookup misses
+            return next_generation()
+
+    async def invalidate(self, scope: Hashable) -> None:
+        try:
+            await self._client.incr(f"{self.prefix}generation:{scope}")
+        except redis.RedisError as e:
+            logger.error("Response cache not invalidated for %s, stale entries expire after the TTL: %s", scope, e)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        try:
+            return await self._client.get(self.prefix + key)
+        except redis.RedisError as e:
+            logger.warning("Response cache unavailable: %s", e)
+            return None
+
+    async def set(self, key: str, value: bytes) -> None:
+        try:
+            await self._client.set(self.prefix + key, value, ex=self.ttl)
+        except redis.RedisError as e:
+            logger.warning("Response cache unavailable: %s", e)
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+
+class NullResponseCache(ResponseCache):
+    """Caches nothing."""
+
+    async def generation(self, scope: Hashable) -> int:
+        return 0
+
+    async def invalidate(self, scope: Hashable) -> None:
+        pass
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return None
+
+    async def set(self, key: str, value: bytes) -> None:
+        pass
+
+
+def create_response_cache(url: str, max_size: int = 1024, ttl: float = 60, workers: int = 1) -> ResponseCache:
+    """
+    Response cache for the configured backend.
+    :param url: empty for the in-process LRU, or the redis:// (rediss://, unix://) URL of a server.
+    :param max_size: maximum number of responses kept by the in-process LRU.
+    :param ttl: seconds a response is kept, 0 disables the cache.
+    :param workers: number of worker processes serving the app; without a URL the cache is only
+        enabled with a single one, as a worker cannot invalidate the pages cached by the others.
+    """
+    if ttl <= 0:
+        return NullResponseCache()
+    if url:
+        return RedisResponseCache(url, ttl=ttl)
+    if workers != 1:
+        return NullResponseCache()
+    return MemoryResponseCache(max_size=max_size, ttl=ttl)
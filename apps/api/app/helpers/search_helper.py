@@ -0,0 +1,22 @@
+import re
+from typing import List
+
+# A search is at most this many words; longer queries are truncated
+MAX_SEARCH_TERMS = 10
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def search_terms(query: str) -> List[str]:
+    """Words of a user's search query, lowercased, with all query-syntax characters dropped."""
+    return _WORD_RE.findall(query.lower())[:MAX_SEARCH_TERMS]
+
+
+def fts5_match_query(terms: List[str]) -> str:
+    """SQLite FTS5 MATCH expression: every term, each as a prefix (`"phon"*` matches "phone")."""
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def tsquery(terms: List[str]) -> str:
+    """Postgres to_tsquery expression: every term, each as a prefix."""
+    return " & ".join(f"{term}:*" for term in terms)
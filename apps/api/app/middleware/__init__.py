@@ -0,0 +1,6 @@
+# ASGI middleware package
+
+from .admission_middleware import AdmissionController, AdmissionControlMiddleware
+from .query_stats_middleware import QueryStatsMiddleware
+
+__all__ = ["AdmissionController", "AdmissionControlMiddleware", "QueryStatsMiddleware"]
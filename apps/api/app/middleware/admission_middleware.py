@@ -0,0 +1,202 @@
+import asyncio
+import collections
+import logging
+import math
+import time
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Tuple
+
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.helpers.cache_helper import TTLCache
+from app.helpers.rate_limit_helper import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+
+class AdmissionController:
+    """
+    Limits the requests handled at once and the request rate of each principal.
+
+    At most `max_in_flight` requests run at a time. Further requests wait in arrival
+    order, at most `max_queue` of them and for at most `queue_timeout` seconds each;
+    the others are turned away. Each principal also has a token bucket refilled at
+    `principal_rate` requests per second, holding up to `principal_burst`.
+    Meant to be used from the event loop only.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int = 64,
+        max_queue: int = 256,
+        queue_timeout: float = 5.0,
+        principal_rate: float = 20.0,
+        principal_burst: int = 40,
+        max_principals: int = 4096,
+    ):
+        """
+        :param max_in_flight: requests handled at once, 0 means no limit.
+        :param max_queue: requests waiting for a slot, further ones are rejected right away.
+        :param queue_timeout: seconds a request waits for a slot before it is rejected.
+        :param principal_rate: requests per second of one principal, 0 means no limit.
+        :param principal_burst: requests one principal can make at once after being idle.
+        :param max_principals: maximum number of principal buckets kept, least recently used go first.
+        """
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.principal_rate = principal_rate
+        self.principal_burst = principal_burst
+        self.in_flight = 0
+        self._waiters: Deque[asyncio.Future] = collections.deque()
+        self._buckets: TTLCache[str, TokenBucket] = TTLCache(max_size=max_principals)
+        self.admitted = 0
+        self.queued = 0
+        self.rejected_queue_full = 0
+        self.rejected_timeout = 0
+        self.rejected_rate_limited = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def check_rate(self, principal: Optional[str]) -> Optional[float]:
+        """
+        Take a request from the principal's bucket.
+        :return: None if the request may proceed, else the seconds until it may be retried.
+        """
+        if principal is None or self.principal_rate <= 0:
+            return None
+        bucket = self._buckets.get(principal)
+        if bucket is None:
+            bucket = TokenBucket(rate=self.principal_rate, capacity=self.principal_burst)
+            self._buckets.set(principal, bucket)
+        if bucket.try_acquire():
+            return None
+        self.rejected_rate_limited += 1
+        return bucket.retry_after()
+
+    async def acquire(self) -> bool:
+        """
+        Wait for a slot.
+        :return: whether the request was admitted; if so, `release` must be called when it is done.
+        """
+        if self.max_in_flight <= 0 or (self.in_flight < self.max_in_flight and not self._waiters):
+            self.in_flight += 1
+            self.admitted += 1
+            return True
+        if len(self._waiters) >= self.max_queue:
+            self.rejected_queue_full += 1
+            return False
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.queued += 1
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(waiter, self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.rejected_timeout += 1
+            return False
+        except asyncio.CancelledError:
+            # The client went away; pass on a slot that was handed over just before
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            raise
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+            waited = time.perf_counter() - started
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+        self.admitted += 1
+        return True
+
+    def release(self) -> None:
+        """Hand the slot of a finished request to the longest waiting one, if any."""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "maxInFlight": self.max_in_flight,
+            "inFlight": self.in_flight,
+            "maxQueue": self.max_queue,
+            "queueDepth": len(self._waiters),
+            "admitted": self.admitted,
+            "queued": self.queued,
+            "rejectedQueueFull": self.rejected_queue_full,
+            "rejectedTimeout": self.rejected_timeout,
+            "rejectedRateLimited": self.rejected_rate_limited,
+            "queueWaitAvgMs": round(self.wait_total / self.queued * 1000, 3) if self.queued else 0.0,
+            "queueWaitMaxMs": round(self.wait_max * 1000, 3),
+            "principals": len(self._buckets),
+        }
+
+
+class AdmissionControlMiddleware:
+    """
+    Applies an AdmissionController to HTTP requests.
+
+    A principal over its rate gets 429, a request that finds the queue full or waits
+    too long gets 503; both come with a Retry-After header. Requests whose path starts
+    with one of `exempt_paths` (e.g. health checks) are always let through.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        controller: AdmissionController,
+        identify: Optional[Callable[[Optional[str]], Awaitable[Optional[str]]]] = None,
+        retry_after: int = 1,
+        exempt_paths: Tuple[str, ...] = (),
+    ):
+        """
+        :param app: the wrapped ASGI application.
+        :param controller: limits and counters, shared with the metrics endpoint.
+        :param identify: maps the Authorization header to the principal, None for anonymous requests.
+        :param retry_after: Retry-After seconds of a 503.
+        :param exempt_paths: path prefixes that are not limited.
+        """
+        self.app = app
+        self.controller = controller
+        self.identify = identify
+        self.retry_after = retry_after
+        self.exempt_paths = exempt_paths
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"].startswith(self.exempt_paths):
+            await self.app(scope, receive, send)
+            return
+
+        if self.identify is not None:
+            principal = await self.identify(Headers(scope=scope).get("authorization"))
+            retry_after = self.controller.check_rate(principal)
+            if retry_after is not None:
+                await self._reject(send, 429, "Too many requests", retry_after)
+                return
+
+        if not await self.controller.acquire():
+            logger.warning("Request rejected by admission control", extra={"path": scope["path"], **self.controller.status()})
+            await self._reject(send, 503, "Server busy, retry later", self.retry_after)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release()
+
+    @staticmethod
+    async def _reject(send: Send, status_code: int, detail: str, retry_after: float) -> None:
+        body = b'{"detail":"%s"}' % detail.encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": status_code,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode("ascii")),
+                (b"retry-after", str(max(math.ceil(retry_after), 1)).encode("ascii")),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,80 @@
+import logging
+import time
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from db.instrumentation import QueryStats, current_query_stats
+
+logger = logging.getLogger(__name__)
+
+
+class QueryStatsMiddleware:
+    """
+    Counts the SQL statements and DB time of each HTTP request.
+
+    The totals at the time the response starts go out in a `Server-Timing` header;
+    the final totals, including statements run after that (streamed bodies, session
+    teardown), are logged once the request is done. With `n_plus_one_threshold` set,
+    a statement executed at least that many times in one request is logged as a
+    possible N+1 query.
+    """
+
+    def __init__(self, app: ASGIApp, n_plus_one_threshold: int = 0):
+        """
+        :param app: the wrapped ASGI application.
+        :param n_plus_one_threshold: repeats of one statement that trigger a warning, 0 disables the check.
+        """
+        self.app = app
+        self.n_plus_one_threshold = n_plus_one_threshold
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats(track_statements=self.n_plus_one_threshold > 0)
+        token = current_query_stats.set(stats)
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "Server-Timing",
+                    f'db;dur={stats.duration * 1000:.1f};desc="{stats.count} queries", '
+                    f"app;dur={(time.perf_counter() - started) * 1000:.1f}",
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_query_stats.reset(token)
+            self._log(scope, status_code, stats, time.perf_counter() - started)
+
+    def _log(self, scope: Scope, status_code: int, stats: QueryStats, elapsed: float) -> None:
+        logger.info(
+            "%s %s %d: %d queries, %.1f ms in DB, %.1f ms total",
+            scope["method"], scope["path"], status_code, stats.count, stats.duration * 1000, elapsed * 1000,
+            extra={
+                "method": scope["method"],
+                "path": scope["path"],
+                "status": status_code,
+                "queries": stats.count,
+                "db_ms": round(stats.duration * 1000, 3),
+                "total_ms": round(elapsed * 1000, 3),
+            },
+        )
+        if stats.statements is None:
+            return
+        for statement, executions in stats.statements.items():
+            if executions >= self.n_plus_one_threshold:
+                logger.warning(
+                    "Possible N+1 query: statement executed %d times in %s %s",
+                    executions, scope["method"], scope["path"],
+                    extra={"statement": statement, "executions": executions},
+                )
@@ -19,7 +19,8 @@ class OrderSchema(BaseModel):
 class AllOrdersSchema(BaseModel):
     """Schema for multiple orders response."""
     orders: List[OrderSchema]
-    total: int
+    total: Optional[int] = None
+    nextCursor: Optional[str] = None
 
 class OrderCreateSchema(BaseModel):
     """Schema for creating a new order."""
@@ -27,6 +28,26 @@ class OrderCreateSchema(BaseModel):
     externalId: str
     description: Optional[str] = None
 
+class OrderBulkConflictSchema(BaseModel):
+    """Order of a bulk import that was not created."""
+    externalId: str
+    detail: str
+
+class OrderBulkResultSchema(BaseModel):
+    """Schema for bulk order import response."""
+    created: List[OrderSchema]
+    conflicts: List[OrderBulkConflictSchema]
+
+class OrderLookupSchema(BaseModel):
+    """Schema for looking up many orders by external ID."""
+    externalIds: List[str]
+
+class OrderLookupResultSchema(BaseModel):
+    """Schema for order lookup response."""
+    orders: List[OrderSchema]
+    # Requested external IDs with no order of the caller's
+    missing: List[str]
+
 class OrderUpdateSchema(BaseModel):
     """Schema for updating an existing order."""
     name: Optional[str] = None
@@ -39,3 +60,14 @@ class OrderGetParamsSchema(BaseModel):
     order: Literal["asc", "desc"] = "asc"
     offset: Optional[int] = 0
     limit: Optional[int] = 10
+    # Opaque keyset cursor from a previous page's `nextCursor`; takes precedence over `offset`
+    cursor: Optional[str] = None
+    # Set to false to skip computing `total`
+    withTotal: bool = True
+
+
+class OrderSearchParamsSchema(BaseModel):
+    """Schema for order search query parameters."""
+    q: str
+    offset: int = 0
+    limit: int = 20
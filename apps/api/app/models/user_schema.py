@@ -18,10 +18,17 @@ class UserSchema(BaseModel):
     class Config:
         from_attributes = True
 
+class UserPrincipalSchema(BaseModel):
+    """Lightweight user record identifying the caller of a request."""
+
+    id: int
+    email: str
+    isActive: bool
+
 class AllUsersSchema(BaseModel):
     """Schema for multiple users response."""
     users: List[UserSchema]
-    total: int
+    total: Optional[int] = None
 
 class UserCreateSchema(BaseModel):
     """Schema for creating a new user."""
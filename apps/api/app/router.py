@@ -1,7 +1,8 @@
 from fastapi import APIRouter
-from app.routers import (users_router, orders_router)
+from app.routers import (users_router, orders_router, metrics_router)
 
 router = APIRouter()
 
 router.include_router(users_router, prefix="/users", tags=["Users"])
-router.include_router(orders_router, prefix="/orders", tags=["Orders"])
\ No newline at end of file
+router.include_router(orders_router, prefix="/orders", tags=["Orders"])
+router.include_router(metrics_router, prefix="/metrics", tags=["Metrics"])
\ No newline at end of file
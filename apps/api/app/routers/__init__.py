@@ -2,5 +2,6 @@
 
 from .user_route import router as users_router
 from .order_route import router as orders_router
+from .metrics_route import router as metrics_router
 
-__all__ = ["users_router", "orders_router"]
\ No newline at end of file
+__all__ = ["users_router", "orders_router", "metrics_router"]
\ No newline at end of file
@@ -0,0 +1,14 @@
+from fastapi import APIRouter, Depends, Request
+from app.helpers.auth_helper import verify_metrics_token
+from db.pool import pool_status
+
+router = APIRouter(dependencies=[Depends(verify_metrics_token)])
+
+@router.get("/db")
+async def get_db_metrics(request: Request):
+    return {name: pool_status(engine) for name, engine in request.app.state.db_engines.items()}
+
+
+@router.get("/admission")
+async def get_admission_metrics(request: Request):
+    return request.app.state.admission.status()
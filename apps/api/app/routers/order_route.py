@@ -1,37 +1,97 @@
-from fastapi import APIRouter, Depends, Query
-from db.main import get_db_session
+import logging
+from fastapi import APIRouter, Depends, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from db.main import get_db_session, get_readonly_db_session
 from app.services.order_service import OrderService
-from app.services.user_service import UserService
-from app.models.order_schema import OrderGetParamsSchema as FilterParams, OrderCreateSchema, OrderUpdateSchema
-from app.helpers.auth_helper import get_current_user_email
+from app.services.principal_service import PrincipalService
+from typing import List, Literal
+from app.models.order_schema import (OrderGetParamsSchema as FilterParams, OrderCreateSchema, OrderUpdateSchema,
+                                     OrderSchema, AllOrdersSchema, OrderBulkResultSchema, OrderSearchParamsSchema,
+                                     OrderLookupSchema, OrderLookupResultSchema)
+from app.helpers.auth_helper import get_session_user_email
+from app.helpers.etag_helper import etag_headers, not_modified_response
+from app.helpers.json_helper import json_response
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
 def get_order_service(db_session=Depends(get_db_session)):
     return OrderService(db_session)
 
-def get_user_service(db_session=Depends(get_db_session)):
-    return UserService(db_session)
+def get_order_reader(db_session=Depends(get_readonly_db_session)):
+    return OrderService(db_session)
+
+def get_principal_service(db_session=Depends(get_db_session)):
+    return PrincipalService(db_session)
+
+def get_principal_reader(db_session=Depends(get_readonly_db_session)):
+    return PrincipalService(db_session)
+
+async def resolve_current_user(email: str, principal_service: PrincipalService):
+    user = None
+    if email:
+        user = await principal_service.get_principal(email)
+    logger.debug("Current user", extra={"user_id": user.id if user else None})
+    return user
+
+# Read-only routes resolve the caller through the read-only session, write routes through
+# the read-write one, so each request uses (and holds) a single connection
+async def current_user(email: str = Depends(get_session_user_email), principal_service: PrincipalService = Depends(get_principal_reader)):
+    return await resolve_current_user(email, principal_service)
+
+async def current_user_for_update(email: str = Depends(get_session_user_email), principal_service: PrincipalService = Depends(get_principal_service)):
+    return await resolve_current_user(email, principal_service)
+
+@router.get("/", response_model=AllOrdersSchema)
+async def get_all_orders(request: Request, current_user = Depends(current_user), order_service: OrderService = Depends(get_order_reader), params: FilterParams = Depends()):
+    etag, body = await order_service.get_orders_page(current_user, params, request.headers.get("If-None-Match"))
+    not_modified = not_modified_response(request, etag)
+    if not_modified:
+        return not_modified
+    return Response(body, media_type="application/json", headers=etag_headers(etag))
+
+@router.get("/search", response_model=AllOrdersSchema)
+async def search_orders(q: str = Query(min_length=1, max_length=200), offset: int = Query(0, ge=0), limit: int = Query(20, ge=1, le=100), current_user = Depends(current_user), order_service: OrderService = Depends(get_order_reader)):
+    params = OrderSearchParamsSchema(q=q, offset=offset, limit=limit)
+    return json_response(await order_service.search_orders(current_user, params))
+
+@router.get("/export")
+async def export_orders(request: Request, export_format: Literal["ndjson", "csv"] = Query("ndjson", alias="format"), current_user = Depends(current_user)):
+    # The export outlives the endpoint function, so it reads through a session owned by the stream itself
+    async def content():
+        async with request.app.state.db_readonly_session_factory(current_user.email if current_user else None) as db_session:
+            async for chunk in OrderService(db_session).export_orders(current_user, export_format):
+                yield chunk
+
+    media_type = "text/csv" if export_format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        content(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="orders.{export_format}"'},
+    )
+
+@router.post("/lookup", response_model=OrderLookupResultSchema)
+async def lookup_orders(lookup: OrderLookupSchema, current_user = Depends(current_user), order_service: OrderService = Depends(get_order_reader)):
+    return json_response(await order_service.lookup_orders(current_user, lookup.externalIds))
 
-async def current_user(email: str = Depends(get_current_user_email), user_service: UserService = Depends(get_user_service)):
-        user = None
-        if email:
-            user = await user_service.get_user_by_email(email)
-        print("Current user:", user)
-        return user
+@router.get("/{external_id}", response_model=OrderSchema)
+async def get_order_by_external_id(external_id: str, current_user = Depends(current_user), order_service: OrderService = Depends(get_order_reader)):
+    return json_response(await order_service.get_order_by_external_id(current_user, external_id))
 
-@router.get("/")
-async def get_all_orders(current_user = Depends(current_user), order_service: OrderService = Depends(get_order_service), params: FilterParams = Depends()):
-    return await order_service.get_all_orders(current_user, params)
+@router.post("/", response_model=OrderSchema)
+async def create_order(order_create: OrderCreateSchema, current_user = Depends(current_user_for_update), order_service: OrderService = Depends(get_order_service)):
+    return json_response(await order_service.create_order(current_user, order_create))
 
-@router.get("/{external_id}")
-async def get_order_by_external_id(external_id: str, current_user = Depends(current_user), order_service: OrderService = Depends(get_order_service)):
-    return await order_service.get_order_by_external_id(current_user, external_id)
+@router.post("/bulk", response_model=OrderBulkResultSchema)
+async def create_orders_bulk(orders_create: List[OrderCreateSchema], current_user = Depends(current_user_for_update), order_service: OrderService = Depends(get_order_service)):
+    return json_response(await order_service.create_orders_bulk(current_user, orders_create))
 
-@router.post("/")
-async def create_order(order_create: OrderCreateSchema, current_user = Depends(current_user), order_service: OrderService = Depends(get_order_service)):
-    return await order_service.create_order(current_user, order_create)
+@router.patch("/{order_id}", response_model=OrderSchema)
+async def update_order(order_id: int, order_update: OrderUpdateSchema, current_user = Depends(current_user_for_update), order_service: OrderService = Depends(get_order_service)):
+    return json_response(await order_service.update_order(current_user, order_id, order_update))
 
-@router.patch("/{order_id}")
-async def update_order(order_id: int, order_update: OrderUpdateSchema, current_user = Depends(current_user), order_service: OrderService = Depends(get_order_service)):
-    return await order_service.update_order(current_user, order_id, order_update)
\ No newline at end of file
+@router.delete("/{order_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_order(order_id: int, current_user = Depends(current_user_for_update), order_service: OrderService = Depends(get_order_service)):
+    await order_service.delete_order(current_user, order_id)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -1,26 +1,35 @@
-from fastapi import APIRouter, Depends
-from db.main import get_db_session
+from fastapi import APIRouter, Depends, Request
+from db.main import get_db_session, get_readonly_db_session
 from app.services.user_service import UserService
-from app.models.user_schema import UserCreateSchema, UserUpdateSchema
-from app.helpers.auth_helper import get_current_user_email
+from app.models.user_schema import UserSchema, UserCreateSchema, UserUpdateSchema
+from app.helpers.auth_helper import get_session_user_email
+from app.helpers.etag_helper import etag_headers, not_modified_response
+from app.helpers.json_helper import json_response
 
 router = APIRouter()
 
 def get_user_service(db_session=Depends(get_db_session)):
     return UserService(db_session)
 
-@router.get("/me")
-async def read_current_user(email: str = Depends(get_current_user_email), user_service: UserService = Depends(get_user_service)):
-    return await user_service.get_user_by_email(email)
+def get_user_reader(db_session=Depends(get_readonly_db_session)):
+    return UserService(db_session)
+
+@router.get("/me", response_model=UserSchema)
+async def read_current_user(request: Request, email: str = Depends(get_session_user_email), user_service: UserService = Depends(get_user_reader)):
+    etag = await user_service.get_user_etag(email)
+    not_modified = not_modified_response(request, etag)
+    if not_modified:
+        return not_modified
+    return json_response(await user_service.get_user_by_email(email), headers=etag_headers(etag))
 
-@router.post("/")
-async def create_user(user_create: UserCreateSchema, email: str = Depends(get_current_user_email), user_service: UserService = Depends(get_user_service)):
-    return await user_service.create_user(email, user_create)
+@router.post("/", response_model=UserSchema)
+async def create_user(user_create: UserCreateSchema, email: str = Depends(get_session_user_email), user_service: UserService = Depends(get_user_service)):
+    return json_response(await user_service.create_user(email, user_create))
 
-@router.patch("/")
-async def update_user(user_update: UserUpdateSchema, email: str = Depends(get_current_user_email), user_service: UserService = Depends(get_user_service)):
-    return await user_service.update_user(email, user_update)
+@router.patch("/", response_model=UserSchema)
+async def update_user(user_update: UserUpdateSchema, email: str = Depends(get_session_user_email), user_service: UserService = Depends(get_user_service)):
+    return json_response(await user_service.update_user(email, user_update))
 
 @router.delete("/")
-async def delete_user(email: str = Depends(get_current_user_email), user_service: UserService = Depends(get_user_service)):
+async def delete_user(email: str = Depends(get_session_user_email), user_service: UserService = Depends(get_user_service)):
     return await user_service.delete_user(email)
\ No newline at end of file
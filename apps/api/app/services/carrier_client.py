@@ -0,0 +1,92 @@
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional
+
+import httpx
+
+# Normalized statuses stored in order.status
+TERMINAL_STATUSES = ("received", "refused", "returned", "deleted")
+
+# Nova Poshta tracking StatusCode -> normalized status
+NOVA_POSHTA_STATUSES = {
+    "1": "created",
+    "2": "deleted",
+    "3": "not_found",
+    "4": "in_transit",
+    "5": "in_transit",
+    "6": "in_transit",
+    "41": "in_transit",
+    "101": "in_transit",
+    "7": "arrived",
+    "8": "arrived",
+    "9": "received",
+    "10": "received",
+    "11": "received",
+    "106": "received",
+    "102": "refused",
+    "103": "refused",
+    "108": "refused",
+    "104": "address_changed",
+    "105": "storage_stopped",
+    "111": "delivery_failed",
+    "112": "delivery_rescheduled",
+}
+
+
+class CarrierClient(ABC):
+    """Looks up the tracking status of many parcels at once."""
+
+    # Largest number of tracking numbers accepted by one `get_statuses` call
+    max_batch_size = 100
+
+    @abstractmethod
+    async def get_statuses(self, external_ids: List[str]) -> Dict[str, str]:
+        """
+        :param external_ids: tracking numbers, at most `max_batch_size` of them.
+        :return: normalized status by tracking number, unknown numbers are left out.
+        """
+
+    async def aclose(self) -> None:
+        pass
+
+
+class NovaPoshtaClient(CarrierClient):
+    """Nova Poshta JSON API client (TrackingDocument.getStatusDocuments)."""
+
+    max_batch_size = 100
+
+    def __init__(
+        self,
+        api_url: str,
+        api_key: str,
+        timeout: float = 10.0,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        """
+        :param api_url: JSON API endpoint.
+        :param api_key: Nova Poshta API key.
+        :param timeout: request timeout in seconds.
+        :param transport: custom httpx transport, e.g. an ASGI stub for offline benchmarks.
+        """
+        self.api_key = api_key
+        self._client = httpx.AsyncClient(base_url=api_url, timeout=timeout, transport=transport)
+
+    async def get_statuses(self, external_ids: List[str]) -> Dict[str, str]:
+        response = await self._client.post("", json={
+            "apiKey": self.api_key,
+            "modelName": "TrackingDocument",
+            "calledMethod": "getStatusDocuments",
+            "methodProperties": {
+                "Documents": [{"DocumentNumber": external_id, "Phone": ""} for external_id in external_ids],
+            },
+        })
+        response.raise_for_status()
+        payload = response.json()
+        if not payload.get("success"):
+            raise httpx.HTTPError(f"Nova Poshta API error: {payload.get('errors')}")
+        return {
+            document["Number"]: NOVA_POSHTA_STATUSES.get(str(document.get("StatusCode")), "unknown")
+            for document in payload.get("data", [])
+        }
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
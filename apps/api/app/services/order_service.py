@@ -1,10 +1,56 @@
+import csv
+import io
+import logging
 from fastapi import HTTPException, status
-from sqlalchemy import select, func, asc, desc
+from sqlalchemy import String, cast, column, delete, func, insert, literal_column, or_, select, table, update
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.exc import SQLAlchemyError, IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
 from db.models import (OrderModel, UserOrderModel)
-from app.models.order_schema import (OrderSchema, AllOrdersSchema, OrderCreateSchema, OrderUpdateSchema, OrderGetParamsSchema)
-from typing import Optional
+from db.writer import run_write
+from app.models.order_schema import (OrderSchema, AllOrdersSchema, OrderCreateSchema, OrderUpdateSchema, OrderGetParamsSchema,
+                                     OrderBulkResultSchema, OrderBulkConflictSchema, OrderSearchParamsSchema,
+                                     OrderLookupResultSchema)
+from app.helpers.cache_helper import TTLCache
+from app.helpers.etag_helper import etag_matches, make_etag
+from app.helpers.json_helper import dump_json, type_adapter
+from app.helpers.pagination_helper import decode_cursor, next_cursor, order_by_keyset, seek_predicate
+from app.helpers.response_cache_helper import create_response_cache
+from app.helpers.search_helper import fts5_match_query, search_terms, tsquery
+from settings import settings
+from typing import AsyncIterator, List, Literal, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# user id -> number of orders, kept up to date by create_order/delete_order
+order_count_cache: TTLCache[int, int] = TTLCache(
+    max_size=settings.order_count_cache_size, ttl=settings.order_count_cache_ttl
+)
+
+# user id -> serialized listing pages (ETag and JSON body), one entry per page parameters
+order_page_cache = create_response_cache(
+    settings.order_page_cache_url, max_size=settings.order_page_cache_size, ttl=settings.order_page_cache_ttl,
+    workers=settings.workers_count,
+)
+
+
+async def invalidate_user_orders(user_id: int) -> None:
+    """Mark the user's orders as changed: cached listing pages are no longer served."""
+    await order_page_cache.invalidate(user_id)
+
+# Columns of an order export, in CSV column order
+EXPORT_FIELDS = list(OrderSchema.model_fields)
+
+# Listing sort fields and their copies in user_orders, which the listing indexes start from
+LISTING_SORT_COLUMNS = {"createdAt": "orderCreatedAt", "name": "orderName", "status": "orderStatus"}
+
+
+def listing_copies(values) -> dict:
+    """The user_orders sort column copies of the given order fields (an order, or a dict of changed fields)."""
+    if isinstance(values, dict):
+        return {copy: values[field] for field, copy in LISTING_SORT_COLUMNS.items() if field in values}
+    return {copy: getattr(values, field) for field, copy in LISTING_SORT_COLUMNS.items()}
 
 class OrderService:
     def __init__(self, db_session: AsyncSession):
@@ -16,30 +62,232 @@ class OrderService:
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Authentication required to access orders.",
             )
-        query = select(OrderModel).join(UserOrderModel, isouter=False, onclause=UserOrderModel.UserId == current_user.id)
-        if params.order.lower() == "asc":
-            query = query.order_by(asc(getattr(OrderModel, params.sortBy)))
-        else:
-            query = query.order_by(desc(getattr(OrderModel, params.sortBy)))
-        total_result = await self.db_session.execute(
-            select(func.count()).select_from(OrderModel).join(UserOrderModel, isouter=False, onclause=UserOrderModel.UserId == current_user.id)
+        orders, total_count = await self._get_page_rows(current_user, params)
+        return self._page_schema(orders, total_count, params)
+
+    async def get_orders_page(self, current_user, params: OrderGetParamsSchema, if_none_match: Optional[str] = None) -> Tuple[str, Optional[bytes]]:
+        """
+        ETag and JSON body of an order listing, from order_page_cache while the user's orders are unchanged.
+        :param if_none_match: the client's If-None-Match header; when it matches, the page is not serialized.
+        :return: the ETag, and the body or None if the client's copy is current.
+        """
+        if not current_user:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Authentication required to access orders.",
+            )
+        # The key carries the user's generation as of now, so a change made while this page
+        # is built stores it under a generation that is no longer read
+        cache_key = await order_page_cache.key(current_user.id, make_etag(params.model_dump()).strip('"'))
+        cached = await order_page_cache.get(cache_key)
+        if cached is not None:
+            etag, body = cached.split(b"\n", 1)
+            return etag.decode("ascii"), body
+
+        orders, total_count = await self._get_page_rows(current_user, params)
+        etag = self.page_etag(current_user, params, orders, total_count)
+        if etag_matches(if_none_match, etag):
+            return etag, None
+        body = dump_json(self._page_schema(orders, total_count, params))
+        await order_page_cache.set(cache_key, etag.encode("ascii") + b"\n" + body)
+        return etag, body
+
+    async def _get_page_rows(self, current_user, params: OrderGetParamsSchema) -> Tuple[List[OrderModel], Optional[int]]:
+        """The orders of a listing page plus the first one of the next page, if any, and the total if requested."""
+        total_count = await self._count_user_orders(current_user) if params.withTotal else None
+        result = await self.db_session.execute(self.list_orders_query(current_user, params))
+        return result.scalars().all(), total_count
+
+    @staticmethod
+    def _page_schema(orders: List[OrderModel], total_count: Optional[int], params: OrderGetParamsSchema) -> AllOrdersSchema:
+        return AllOrdersSchema(
+            # One validation call for the whole page instead of one per row
+            orders=type_adapter(List[OrderSchema]).validate_python(orders[:params.limit], from_attributes=True),
+            total=total_count,
+            nextCursor=next_cursor(orders, params.limit, params.sortBy, params.order),
         )
-        total_count = total_result.scalar_one()
 
-        result = await self.db_session.execute(
-            query.limit(params.limit).offset(params.offset)
+    @staticmethod
+    def page_etag(current_user, params: OrderGetParamsSchema, orders: List[OrderModel], total_count: Optional[int]) -> str:
+        """
+        ETag of an order listing page, from the ids and row versions of the rows it was built from
+        (the first order of the next page decides nextCursor), the total and the request parameters.
+        Only depends on what is in the database, so every worker computes the same one.
+        """
+        return make_etag(
+            current_user.id, params.model_dump(), total_count, [(order.id, order.version) for order in orders],
         )
-        return AllOrdersSchema(orders=[OrderSchema.from_orm(order) for order in result.scalars().all()], total=total_count)
 
-    async def get_order_by_external_id(self, external_id: str) -> Optional[OrderSchema]:
+    async def search_orders(self, current_user, params: OrderSearchParamsSchema) -> AllOrdersSchema:
+        """Full-text search over the names and descriptions of the user's orders, best matches first."""
+        if not current_user:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Authentication required to access orders.",
+            )
+        terms = search_terms(params.q)
+        if not terms:
+            return AllOrdersSchema(orders=[])
+        query = self.search_orders_query(current_user, terms, self.db_session.bind.dialect.name)
+        result = await self.db_session.execute(query.offset(params.offset).limit(params.limit))
+        return AllOrdersSchema(
+            orders=type_adapter(List[OrderSchema]).validate_python(result.scalars().all(), from_attributes=True),
+        )
+
+    @classmethod
+    def search_orders_query(cls, current_user, terms: List[str], dialect: str):
+        query = cls._user_orders_query(current_user)
+        if dialect == "sqlite":
+            # FTS5 external-content table kept in sync by triggers, `rank` is its bm25 score
+            order_fts = table("order_fts", column("rowid"), column("rank"))
+            return query.join(order_fts, order_fts.c.rowid == OrderModel.id)\
+                .where(literal_column("order_fts").match(fts5_match_query(terms)))\
+                .order_by(order_fts.c.rank, OrderModel.id.desc())
+        if dialect == "postgresql":
+            # Generated tsvector column with a GIN index
+            search_vector = literal_column('"order".search_vector')
+            ts_query = func.to_tsquery("simple", tsquery(terms))
+            return query.where(search_vector.op("@@")(ts_query))\
+                .order_by(func.ts_rank(search_vector, ts_query).desc(), OrderModel.id.desc())
+        # No full-text index on other backends: every term must appear in the name or the description
+        for term in terms:
+            query = query.where(or_(OrderModel.name.icontains(term), OrderModel.description.icontains(term)))
+        return query.order_by(OrderModel.id.desc())
+
+    async def export_orders(self, current_user, export_format: Literal["ndjson", "csv"]) -> AsyncIterator[bytes]:
+        """
+        Stream all of the user's orders as NDJSON lines or CSV rows.
+        Rows are read through a server-side cursor in batches of `orders_export_batch_size`,
+        one output chunk per batch, so memory use does not depend on the number of orders.
+        """
+        if not current_user:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Authentication required to access orders.",
+            )
+        query = self._user_orders_query(current_user)\
+            .with_only_columns(*(getattr(OrderModel, field) for field in EXPORT_FIELDS))\
+            .order_by(OrderModel.id)\
+            .execution_options(yield_per=settings.orders_export_batch_size)
+        result = await self.db_session.stream(query)
+
+        if export_format == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(EXPORT_FIELDS)
+            async for rows in result.partitions():
+                writer.writerows(rows)
+                yield buffer.getvalue().encode("utf-8")
+                buffer.seek(0)
+                buffer.truncate()
+            if buffer.tell():
+                yield buffer.getvalue().encode("utf-8")
+        else:
+            async for rows in result.partitions():
+                yield b"".join(
+                    OrderSchema.model_validate(row, from_attributes=True).model_dump_json().encode("utf-8") + b"\n"
+                    for row in rows
+                )
+
+    @classmethod
+    def list_orders_query(cls, current_user, params: OrderGetParamsSchema):
+        """
+        Page of the user's orders; fetches one extra row to tell whether there is a next page.
+        Sorts and seeks on the copies of the sort columns in user_orders, so that the database walks
+        the user's (UserId, sort column, OrderId) index and stops after the page instead of sorting.
+        """
+        column = UserOrderModel.__table__.c[LISTING_SORT_COLUMNS[params.sortBy]]
+        id_column = UserOrderModel.__table__.c.OrderId
+        descending = params.order.lower() != "asc"
+        query = select(OrderModel)\
+            .select_from(UserOrderModel)\
+            .join(OrderModel, UserOrderModel.OrderId == OrderModel.id)\
+            .where(UserOrderModel.UserId == current_user.id)\
+            .order_by(*order_by_keyset(column, id_column, descending))
+        if params.cursor:
+            value, last_id = decode_cursor(params.cursor, column, params.sortBy, params.order)
+            query = query.where(seek_predicate(column, id_column, value, last_id, descending))
+        else:
+            query = query.offset(params.offset)
+        return query.limit(params.limit + 1 if params.limit is not None else None)
+
+    async def _count_user_orders(self, current_user) -> int:
+        total_count = order_count_cache.get(current_user.id)
+        if total_count is None:
+            total_result = await self.db_session.execute(self.count_orders_query(current_user))
+            total_count = total_result.scalar_one()
+            order_count_cache.set(current_user.id, total_count)
+        return total_count
+
+    @staticmethod
+    def count_orders_query(current_user):
+        # Every link points at an existing order (FK with cascade), so the junction table alone is enough
+        return select(func.count()).select_from(UserOrderModel).where(UserOrderModel.UserId == current_user.id)
+
+    @staticmethod
+    def _owned_by(current_user):
+        """Condition that the order in the enclosing statement is linked to the user."""
+        return select(UserOrderModel.id)\
+            .where(UserOrderModel.OrderId == OrderModel.id, UserOrderModel.UserId == current_user.id)\
+            .exists()
+
+    @staticmethod
+    def _owner_ids_column(order_id: int, dialect: str):
+        """Comma-separated ids of all users linked to the order, as a scalar subquery for a RETURNING clause."""
+        user_id = UserOrderModel.UserId
+        owner_ids = func.string_agg(cast(user_id, String), ",") if dialect == "postgresql" else func.group_concat(user_id)
+        return select(owner_ids).where(UserOrderModel.OrderId == order_id).scalar_subquery()
+
+    @staticmethod
+    def _user_orders_query(current_user):
+        return select(OrderModel)\
+            .join(UserOrderModel, UserOrderModel.OrderId == OrderModel.id)\
+            .where(UserOrderModel.UserId == current_user.id)
+
+    async def get_order_by_external_id(self, current_user, external_id: str) -> Optional[OrderSchema]:
+        if not current_user:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Authentication required to access orders.",
+            )
         result = await self.db_session.execute(
-            select(OrderModel).where(OrderModel.externalId == external_id)
+            self._user_orders_query(current_user).where(OrderModel.externalId == external_id)
         )
         order = result.scalars().first()
 
         if not order:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Order not found")
         return OrderSchema.from_orm(order)
+
+    async def lookup_orders(self, current_user, external_ids: List[str]) -> OrderLookupResultSchema:
+        """
+        The user's orders with any of the given external IDs, in request order, from one IN query
+        over the externalId unique index. IDs without an order of the user's are reported as missing.
+        """
+        if not current_user:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Authentication required to access orders.",
+            )
+        unique_ids = list(dict.fromkeys(external_ids))
+        if len(unique_ids) > settings.orders_lookup_max_items:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"At most {settings.orders_lookup_max_items} orders can be looked up at once",
+            )
+        if not unique_ids:
+            return OrderLookupResultSchema(orders=[], missing=[])
+
+        result = await self.db_session.execute(
+            self._user_orders_query(current_user).where(OrderModel.externalId.in_(unique_ids))
+        )
+        found = {order.externalId: order for order in result.scalars().all()}
+        return OrderLookupResultSchema(
+            orders=type_adapter(List[OrderSchema]).validate_python(
+                [found[external_id] for external_id in unique_ids if external_id in found], from_attributes=True
+            ),
+            missing=[external_id for external_id in unique_ids if external_id not in found],
+        )
     
     async def create_order(self, current_user, order_create: OrderCreateSchema) -> OrderSchema:
         if not current_user:
@@ -48,28 +296,35 @@ class OrderService:
                 detail="Authentication required to access orders.",
             )
         
-        try:
+        async def create(db_session: AsyncSession) -> OrderModel:
             new_order = OrderModel(
                 externalId=order_create.externalId,
                 name=order_create.name,
                 description=order_create.description,
             )
-            self.db_session.add(new_order)
-            await self.db_session.flush()  # Get the order ID without committing
-            
+            db_session.add(new_order)
+            await db_session.flush()  # Get the order ID without committing
+            await db_session.refresh(new_order)  # and the server-side createdAt
+
             # Create the junction table record
             user_order = UserOrderModel(
                 UserId=current_user.id,
-                OrderId=new_order.id
+                OrderId=new_order.id,
+                **listing_copies(new_order),
             )
-            self.db_session.add(user_order)
-            await self.db_session.commit()
-            await self.db_session.refresh(new_order)
+            db_session.add(user_order)
+            await db_session.flush()
+            return new_order
+
+        try:
+            new_order = await run_write(self.db_session, create)
+            order_count_cache.incr(current_user.id)
+            await invalidate_user_orders(current_user.id)
             return OrderSchema.from_orm(new_order)
         except IntegrityError as e:
             await self.db_session.rollback()
             error_info = str(e.orig) if hasattr(e, 'orig') else str(e)
-            print("IntegrityError info:", error_info)
+            logger.warning("Order not created: %s", error_info, extra={"user_id": current_user.id})
             if 'unique constraint' in error_info.lower() or 'duplicate key' in error_info.lower():
                 if 'email' in error_info.lower():
                     raise HTTPException(
@@ -97,30 +352,129 @@ class OrderService:
         except Exception as e:
             await self.db_session.rollback()
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
-        
 
-    async def update_order(self, current_user, order_id: int, order_update: OrderUpdateSchema) -> OrderSchema:
+    async def create_orders_bulk(self, current_user, orders_create: List[OrderCreateSchema]) -> OrderBulkResultSchema:
+        """
+        Create many orders in one transaction with a multi-row INSERT ... RETURNING statement
+        (INSERT then SELECT on databases without RETURNING).
+        Orders whose externalId already exists, or repeats an earlier item, are reported as conflicts.
+        """
         if not current_user:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Authentication required to access orders.",
             )
+        if len(orders_create) > settings.orders_bulk_max_items:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"At most {settings.orders_bulk_max_items} orders can be imported at once",
+            )
+
+        conflicts = []
+        rows = {}
+        for order_create in orders_create:
+            if order_create.externalId in rows:
+                conflicts.append(OrderBulkConflictSchema(externalId=order_create.externalId, detail="Duplicate externalId in request"))
+            else:
+                rows[order_create.externalId] = order_create.model_dump()
+        if not rows:
+            return OrderBulkResultSchema(created=[], conflicts=conflicts)
+
+        async def create(db_session: AsyncSession) -> List[OrderModel]:
+            dialect = db_session.bind.dialect.name
+            if dialect in ("sqlite", "postgresql"):
+                dialect_insert = sqlite.insert if dialect == "sqlite" else postgresql.insert
+                stmt = dialect_insert(OrderModel).values(list(rows.values()))\
+                    .on_conflict_do_nothing(index_elements=["externalId"])\
+                    .returning(OrderModel)
+                created = (await db_session.scalars(stmt)).all()
+            else:
+                # Neither ON CONFLICT nor RETURNING (MySQL): leave out the externalIds that already
+                # exist, they are reported as conflicts below, and read the new orders back by externalId
+                existing = await db_session.scalars(
+                    select(OrderModel.externalId).where(OrderModel.externalId.in_(rows))
+                )
+                existing_ids = set(existing.all())
+                new_rows = [row for external_id, row in rows.items() if external_id not in existing_ids]
+                created = []
+                if new_rows:
+                    await db_session.execute(insert(OrderModel).values(new_rows))
+                    result = await db_session.scalars(
+                        select(OrderModel).where(OrderModel.externalId.in_([row["externalId"] for row in new_rows]))
+                    )
+                    created = result.all()
+            if created:
+                await db_session.execute(
+                    insert(UserOrderModel).values([
+                        {"UserId": current_user.id, "OrderId": order.id, **listing_copies(order)} for order in created
+                    ])
+                )
+            return created
+
         try:
-            stmt = select(OrderModel).where(OrderModel.id == order_id)
-            result = await self.db_session.execute(stmt)
+            created = await run_write(self.db_session, create)
+            order_count_cache.incr(current_user.id, len(created))
+            if created:
+                await invalidate_user_orders(current_user.id)
+        except IntegrityError as e:
+            await self.db_session.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, 
+                detail="Data integrity constraint violation"
+            )
+        except SQLAlchemyError as e:
+            await self.db_session.rollback()
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Database error occurred")
+
+        created_ids = {order.externalId for order in created}
+        conflicts.extend(
+            OrderBulkConflictSchema(externalId=external_id, detail="Order with this externalId already exists")
+            for external_id in rows if external_id not in created_ids
+        )
+        created_by_external_id = {order.externalId: order for order in created}
+        return OrderBulkResultSchema(
+            created=type_adapter(List[OrderSchema]).validate_python(
+                [created_by_external_id[external_id] for external_id in rows if external_id in created_ids], from_attributes=True
+            ),
+            conflicts=conflicts,
+        )
+
+    async def update_order(self, current_user, order_id: int, order_update: OrderUpdateSchema) -> OrderSchema:
+        if not current_user:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Authentication required to access orders.",
+            )
+        update_data = order_update.model_dump(exclude_unset=True)
+        if not update_data:
+            result = await self.db_session.execute(self._user_orders_query(current_user).where(OrderModel.id == order_id))
             order = result.scalar_one_or_none()
             if not order:
                 raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Order not found")
+            return OrderSchema.from_orm(order)
 
-            update_data = order_update.model_dump(exclude_unset=True)
-
-            for field, value in update_data.items():
-                setattr(order, field, value)
-
-            await self.db_session.commit()
-            await self.db_session.refresh(order)
+        async def change(db_session: AsyncSession) -> Tuple[Optional[OrderModel], List[int]]:
+            # One statement checks ownership, updates and reads back the row, along with every
+            # user it is listed for, not just the caller
+            stmt = update(OrderModel)\
+                .where(OrderModel.id == order_id, self._owned_by(current_user))\
+                .values(**update_data)\
+                .returning(OrderModel, self._owner_ids_column(order_id, db_session.bind.dialect.name))\
+                .execution_options(synchronize_session=False)
+            row = (await db_session.execute(stmt)).one_or_none()
+            if row is None:
+                return None, []
+            order, owner_ids = row
+            copies = listing_copies(update_data)
+            if copies:
+                await db_session.execute(
+                    update(UserOrderModel).where(UserOrderModel.OrderId == order_id).values(**copies)
+                    .execution_options(synchronize_session=False)
+                )
+            return order, [int(user_id) for user_id in owner_ids.split(",")] if owner_ids else []
 
-            return OrderSchema.from_orm(order)
+        try:
+            order, owners = await run_write(self.db_session, change)
         except IntegrityError as e:
             await self.db_session.rollback()
             error_info = str(e.orig) if hasattr(e, 'orig') else str(e)
@@ -147,6 +501,12 @@ class OrderService:
         except Exception as e:
             await self.db_session.rollback()
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+        # A missing order and another user's order look the same
+        if order is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Order not found")
+        for user_id in owners:
+            await invalidate_user_orders(user_id)
+        return OrderSchema.from_orm(order)
 
     async def delete_order(self, current_user, order_id: int) -> None:
         if not current_user:
@@ -154,22 +514,40 @@ class OrderService:
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Authentication required to access orders.",
             )
-        result = await self.db_session.execute(
-            select(OrderModel).where(OrderModel.id == order_id)
-        )
-        order = result.scalars().first()
-        if not order:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Order not found.",
-            )
-        await self.db_session.delete(order)
+        # Deleting the links first checks ownership and returns every user who loses the order in one
+        # statement; the subquery sees the links as they were before the statement
+        own_link = aliased(UserOrderModel)
+        unlink = delete(UserOrderModel)\
+            .where(
+                UserOrderModel.OrderId == order_id,
+                select(own_link.id).where(own_link.OrderId == order_id, own_link.UserId == current_user.id).exists(),
+            )\
+            .returning(UserOrderModel.UserId)\
+            .execution_options(synchronize_session=False)
+        stmt = delete(OrderModel)\
+            .where(OrderModel.id == order_id)\
+            .execution_options(synchronize_session=False)
+
+        async def remove(db_session: AsyncSession) -> List[int]:
+            owners = (await db_session.scalars(unlink)).all()
+            if owners:
+                await db_session.execute(stmt)
+            return owners
+
         try:
-            await self.db_session.commit()
+            owners = await run_write(self.db_session, remove)
         except SQLAlchemyError as e:
             await self.db_session.rollback()
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="An error occurred while deleting the order.",
             ) from e
+        if not owners:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Order not found.",
+            )
+        for user_id in owners:
+            order_count_cache.incr(user_id, -1)
+            await invalidate_user_orders(user_id)
     
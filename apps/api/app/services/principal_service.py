@@ -0,0 +1,37 @@
+from fastapi import HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from db.models import UserModel
+from app.helpers.cache_helper import TTLCache
+from app.models.user_schema import UserPrincipalSchema
+from settings import settings
+
+# email -> principal, invalidated by UserService on update/delete
+principal_cache: TTLCache[str, UserPrincipalSchema] = TTLCache(
+    max_size=settings.principal_cache_size, ttl=settings.principal_cache_ttl
+)
+
+
+def invalidate_principal(email: str) -> None:
+    principal_cache.pop(email)
+
+
+class PrincipalService:
+    def __init__(self, db_session: AsyncSession):
+        self.db_session = db_session
+
+    async def get_principal(self, email: str) -> UserPrincipalSchema:
+        principal = principal_cache.get(email)
+        if principal is not None:
+            return principal
+
+        result = await self.db_session.execute(
+            select(UserModel.id, UserModel.email, UserModel.isActive).where(UserModel.email == email)
+        )
+        row = result.one_or_none()
+        if not row:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+
+        principal = UserPrincipalSchema(id=row.id, email=row.email, isActive=row.isActive)
+        principal_cache.set(email, principal)
+        return principal
@@ -0,0 +1,157 @@
+import asyncio
+import logging
+import time
+from typing import List, Optional, Tuple
+
+from sqlalchemy import bindparam, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from db.lease import DbLease
+from db.models import OrderModel, UserOrderModel
+from db.writer import run_write
+from app.helpers.rate_limit_helper import TokenBucket
+from app.services.carrier_client import CarrierClient, TERMINAL_STATUSES
+from app.services.order_service import invalidate_user_orders
+
+logger = logging.getLogger(__name__)
+
+
+class TrackingRefresher:
+    """
+    Background worker that keeps order.status in sync with the carrier.
+
+    Each pass walks all orders that are not in a terminal status, asks the carrier
+    about them in batches, with at most `concurrency` requests in flight and at most
+    `rate_limit` requests per second, and writes back the statuses that changed.
+
+    With a lease, every worker process runs a refresher but only the lease holder does
+    a pass; the others check every `lease_ttl` seconds whether the next pass is due,
+    and take over if the holder dies during a pass.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        carrier: CarrierClient,
+        batch_size: int = 100,
+        concurrency: int = 4,
+        rate_limit: float = 5.0,
+        interval: float = 900,
+        lease: Optional[DbLease] = None,
+        lease_ttl: float = 60,
+    ):
+        """
+        :param session_factory: factory for database sessions.
+        :param carrier: carrier client used for status lookups.
+        :param batch_size: tracking numbers per carrier request, capped by the carrier's max_batch_size.
+        :param concurrency: max number of carrier requests in flight.
+        :param rate_limit: max carrier requests per second.
+        :param interval: seconds between the end of one pass and the start of the next.
+        :param lease: lease shared by the refreshers of all processes, none means this one always refreshes.
+        :param lease_ttl: seconds a pass holds the lease without renewing it.
+        """
+        if rate_limit <= 0:
+            raise ValueError("rate_limit must be positive")
+        self.session_factory = session_factory
+        self.carrier = carrier
+        self.batch_size = min(batch_size, carrier.max_batch_size)
+        self.concurrency = concurrency
+        self.interval = interval
+        self.lease = lease
+        self.lease_ttl = lease_ttl
+        self._bucket = TokenBucket(rate=rate_limit, capacity=max(rate_limit, 1))
+        self._task: Optional[asyncio.Task] = None
+
+    async def run_once(self) -> int:
+        """
+        Refresh every non-terminal order once.
+        :return: number of orders whose status changed.
+        """
+        slots = asyncio.Semaphore(self.concurrency)
+        tasks = []
+        last_id = 0
+        while True:
+            # A short-lived session per page, so no read transaction stays open while batches write
+            async with self.session_factory() as db_session:
+                batch = await self._next_batch(db_session, last_id)
+            if not batch:
+                break
+            if self.lease is not None and not await self.lease.acquire(self.lease_ttl):
+                logger.warning("Tracking refresh lost its lease, stopping the pass")
+                break
+            last_id = batch[-1][0]
+            await slots.acquire()
+            tasks.append(asyncio.create_task(self._refresh_batch(batch, slots)))
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        for result in results:
+            if isinstance(result, Exception):
+                logger.warning("Tracking batch failed: %r", result)
+        return sum(result for result in results if isinstance(result, int))
+
+    async def _next_batch(self, db_session: AsyncSession, last_id: int) -> List[Tuple[int, str, Optional[str]]]:
+        result = await db_session.execute(
+            select(OrderModel.id, OrderModel.externalId, OrderModel.status)
+            .where(OrderModel.id > last_id)
+            .where(or_(OrderModel.status.is_(None), OrderModel.status.not_in(TERMINAL_STATUSES)))
+            .order_by(OrderModel.id)
+            .limit(self.batch_size)
+        )
+        return [tuple(row) for row in result.all()]
+
+    async def _refresh_batch(self, batch: List[Tuple[int, str, Optional[str]]], slots: asyncio.Semaphore) -> int:
+        try:
+            await self._bucket.acquire()
+            statuses = await self.carrier.get_statuses([external_id for _, external_id, _ in batch])
+        finally:
+            slots.release()
+
+        changes = [
+            {"id": order_id, "status": statuses[external_id]}
+            for order_id, external_id, current in batch
+            if external_id in statuses and statuses[external_id] != current
+        ]
+        if changes:
+            async def apply(writer_session: AsyncSession) -> None:
+                # ORM bulk UPDATE by primary key: one executemany for the whole batch
+                await writer_session.execute(update(OrderModel), changes)
+                # and one for the status copies the order listing sorts on
+                links = UserOrderModel.__table__
+                await writer_session.execute(
+                    update(links).where(links.c.OrderId == bindparam("order_id")).values(orderStatus=bindparam("order_status")),
+                    [{"order_id": change["id"], "order_status": change["status"]} for change in changes],
+                )
+
+            async with self.session_factory() as db_session:
+                await run_write(db_session, apply)
+                owners = await db_session.scalars(
+                    select(UserOrderModel.UserId).distinct()
+                    .where(UserOrderModel.OrderId.in_([change["id"] for change in changes]))
+                )
+                for user_id in owners.all():
+                    await invalidate_user_orders(user_id)
+        return len(changes)
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run_forever())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.carrier.aclose()
+
+    async def _run_forever(self) -> None:
+        while True:
+            try:
+                if self.lease is None or await self.lease.acquire(self.lease_ttl):
+                    updated = await self.run_once()
+                    logger.info("Tracking refresh updated %d orders", updated)
+                    if self.lease is not None:
+                        # Nobody takes the lease again before the next pass is due
+                        await self.lease.release(blocked_until=time.time() + self.interval)
+            except Exception:
+                logger.exception("Tracking refresh failed")
+            await asyncio.sleep(self.interval if self.lease is None else min(self.interval, self.lease_ttl))
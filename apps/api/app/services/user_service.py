@@ -1,36 +1,61 @@
+import logging
 from fastapi import HTTPException, status
-from sqlalchemy import select, func, asc, desc
+from sqlalchemy import select, func, asc, desc, text
 from sqlalchemy.exc import SQLAlchemyError, IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from db.models import (UserModel, OrderModel, UserOrderModel)
+from db.models import UserModel
+from db.writer import run_write
 from app.models.user_schema import AllUsersSchema, UserSchema, UserCreateSchema, UserUpdateSchema
+from app.helpers.etag_helper import make_etag
+from app.services.principal_service import invalidate_principal
+from typing import Literal, Optional
+
+logger = logging.getLogger(__name__)
 
 class UserService:
     def __init__(self, db_session: AsyncSession):
         self.db_session = db_session
 
-    async def get_all_users(self, limit: int = 10, offset: int = 0, sort_by: str = "id", sort_order: str = "asc") -> AllUsersSchema:
+    async def get_all_users(self, limit: int = 10, offset: int = 0, sort_by: str = "id", sort_order: str = "asc", total_mode: Literal["exact", "estimated", "none"] = "exact") -> AllUsersSchema:
         query = select(UserModel)
         if sort_order.lower() == "asc":
             query = query.order_by(asc(getattr(UserModel, sort_by)))
         else:
             query = query.order_by(desc(getattr(UserModel, sort_by)))
 
-        total_result = await self.db_session.execute(
-            select(func.count()).select_from(UserModel)
-        )
-        total_count = total_result.scalar_one()
+        total_count = None
+        if total_mode == "estimated":
+            total_count = await self._estimate_user_count()
+        if total_mode == "exact" or (total_mode == "estimated" and total_count is None):
+            total_result = await self.db_session.execute(
+                select(func.count()).select_from(UserModel)
+            )
+            total_count = total_result.scalar_one()
 
         result = await self.db_session.execute(
             query.limit(limit).offset(offset)
         )
         return AllUsersSchema(users=[UserSchema.from_orm(user) for user in result.scalars().all()], total=total_count)
+
+    async def _estimate_user_count(self) -> Optional[int]:
+        """
+        Cheap approximate number of users, without scanning the table.
+        Postgres: planner statistics; other backends: the highest id.
+        :return: the estimate, or None if the backend has no usable estimate.
+        """
+        if self.db_session.bind.dialect.name == "postgresql":
+            result = await self.db_session.execute(
+                text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:table)"),
+                {"table": f'"{UserModel.__tablename__}"'},
+            )
+            estimate = result.scalar_one_or_none()
+            # reltuples is -1 until the table has been vacuumed or analyzed
+            return estimate if estimate is not None and estimate >= 0 else None
+        result = await self.db_session.execute(select(func.max(UserModel.id)))
+        return result.scalar_one() or 0
     
     async def get_user_by_id(self, user_id: int) -> UserSchema:
-        stmt = select(UserModel)\
-            .join(UserOrderModel, UserModel.id == UserOrderModel.UserId, isouter=True)\
-            .join(OrderModel, UserOrderModel.OrderId == OrderModel.id, isouter=True)\
-            .where(UserModel.id == user_id)
+        stmt = select(UserModel).where(UserModel.id == user_id)
         
         result = await self.db_session.execute(stmt)
         user = result.scalar_one_or_none()
@@ -40,11 +65,21 @@ class UserService:
     
         return UserSchema.from_orm(user)
     
+    async def get_user_etag(self, email: str) -> Optional[str]:
+        """
+        ETag of the user's record, from its id and row version only; the same in every worker.
+        :return: the ETag, or None if there is no such user.
+        """
+        result = await self.db_session.execute(
+            select(UserModel.id, UserModel.version).where(UserModel.email == email)
+        )
+        row = result.one_or_none()
+        if not row:
+            return None
+        return make_etag(row.id, row.version)
+
     async def get_user_by_email(self, email: str) -> UserSchema:
-        stmt = select(UserModel)\
-            .join(UserOrderModel, UserModel.id == UserOrderModel.UserId, isouter=True)\
-            .join(OrderModel, UserOrderModel.OrderId == OrderModel.id, isouter=True)\
-            .where(UserModel.email == email)
+        stmt = select(UserModel).where(UserModel.email == email)
         
         result = await self.db_session.execute(stmt)
         user = result.scalar_one_or_none()
@@ -55,17 +90,21 @@ class UserService:
         return UserSchema.from_orm(user)
 
     async def create_user(self, email: str, user_create: UserCreateSchema) -> UserSchema:
-        try:
+        async def create(db_session: AsyncSession) -> UserModel:
             new_user = UserModel(
                 email=email,
                 name=user_create.name,
                 phone=user_create.phone,
                 isActive=False
             )
-            self.db_session.add(new_user)
-            print("Added new user to session:", new_user)
-            await self.db_session.commit()
-            await self.db_session.refresh(new_user)
+            db_session.add(new_user)
+            await db_session.flush()
+            await db_session.refresh(new_user)
+            return new_user
+
+        try:
+            new_user = await run_write(self.db_session, create)
+            logger.info("User created", extra={"user_id": new_user.id})
             return UserSchema.from_orm(new_user)
         except IntegrityError as e:
             await self.db_session.rollback()
@@ -100,9 +139,9 @@ class UserService:
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
     
     async def update_user(self, email: str, user_update: UserUpdateSchema) -> UserSchema:
-        try:
+        async def update(db_session: AsyncSession) -> UserModel:
             stmt = select(UserModel).where(UserModel.email == email)
-            result = await self.db_session.execute(stmt)
+            result = await db_session.execute(stmt)
             user = result.scalar_one_or_none()
 
             if not user:
@@ -113,8 +152,13 @@ class UserService:
             for field, value in update_data.items():
                 setattr(user, field, value)
 
-            await self.db_session.commit()
-            await self.db_session.refresh(user)
+            await db_session.flush()
+            await db_session.refresh(user)
+            return user
+
+        try:
+            user = await run_write(self.db_session, update)
+            invalidate_principal(email)
 
             return UserSchema.from_orm(user)
         except IntegrityError as e:
@@ -145,16 +189,20 @@ class UserService:
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
     
     async def delete_user(self, email: str) -> None:
-        try:
+        async def delete(db_session: AsyncSession) -> None:
             stmt = select(UserModel).where(UserModel.email == email)
-            result = await self.db_session.execute(stmt)
+            result = await db_session.execute(stmt)
             user = result.scalar_one_or_none()
 
             if not user:
                 raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
 
-            await self.db_session.delete(user)
-            await self.db_session.commit()
+            await db_session.delete(user)
+            await db_session.flush()
+
+        try:
+            await run_write(self.db_session, delete)
+            invalidate_principal(email)
         except IntegrityError as e:
             await self.db_session.rollback()
             error_info = str(e.orig) if hasattr(e, 'orig') else str(e)
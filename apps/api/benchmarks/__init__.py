@@ -0,0 +1,7 @@
+"""
+Offline benchmarks for the API.
+
+Run them from the apps/api directory, e.g.::
+
+    poetry run python -m benchmarks.listing_plan --orders 1000000
+"""
@@ -0,0 +1,60 @@
+"""
+Order listing cost as the global order table grows while the caller's own orders stay fixed.
+
+    python -m benchmarks.listing_scaling --owned 1000 --sizes 10000 100000 1000000
+
+The user's count and first page should cost about the same at every size:
+the listing must only ever touch the caller's own orders.
+"""
+import argparse
+import statistics
+import sys
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.models.order_schema import OrderGetParamsSchema
+from app.models.user_schema import UserPrincipalSchema
+from app.services.order_service import OrderService
+from benchmarks.seed import seed, user_email
+
+
+def time_ms(session: Session, statement, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        session.execute(statement).all()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="sqlite:///./bench_orders.db", help="synchronous database URL")
+    parser.add_argument("--owned", type=int, default=1000, help="orders owned by the measured user")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    engine = create_engine(args.url)
+    principal = UserPrincipalSchema(id=1, email=user_email(1), isActive=True)
+    params = OrderGetParamsSchema(sortBy="createdAt", order="desc", limit=10)
+    results = []
+    for size in args.sizes:
+        # Orders are dealt round-robin, so user 1 owns size / users of them
+        seed(engine, users=max(size // args.owned, 1), orders=size)
+        with Session(engine) as session:
+            owned = session.execute(OrderService.count_orders_query(principal)).scalar_one()
+            count_ms = time_ms(session, OrderService.count_orders_query(principal), args.repeat)
+            page_ms = time_ms(session, OrderService.list_orders_query(principal, params), args.repeat)
+        results.append((size, owned, count_ms, page_ms))
+
+    print(f"\n{'orders':>10} {'owned':>8} {'count ms':>10} {'page ms':>10}")
+    for size, owned, count_ms, page_ms in results:
+        print(f"{size:>10} {owned:>8} {count_ms:>10.2f} {page_ms:>10.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,48 @@
+"""
+Local stand-in for the Nova Poshta JSON API (TrackingDocument.getStatusDocuments only).
+
+    uvicorn benchmarks.np_stub_server:app --port 8081
+    APP_TRACKING_REFRESH_ENABLED=true APP_NP_API_URL=http://127.0.0.1:8081/ uvicorn main:app
+
+The status of a parcel is derived from its number, so repeated runs see the same data.
+Set NP_STUB_LATENCY_MS to simulate the carrier's response time.
+"""
+import asyncio
+import os
+import zlib
+
+from fastapi import FastAPI, Request
+
+# Status codes handed out by the stub, a mix of terminal and in-flight ones
+STATUS_CODES = ["1", "4", "5", "7", "9", "10", "102", "104", "111"]
+
+app = FastAPI(title="Nova Poshta API stub")
+app.state.latency_ms = float(os.environ.get("NP_STUB_LATENCY_MS", "50"))
+app.state.requests = 0
+app.state.documents = 0
+
+
+def status_code_for(number: str) -> str:
+    return STATUS_CODES[zlib.crc32(number.encode("utf-8")) % len(STATUS_CODES)]
+
+
+@app.post("/")
+async def json_api(request: Request):
+    payload = await request.json()
+    if payload.get("modelName") != "TrackingDocument" or payload.get("calledMethod") != "getStatusDocuments":
+        return {"success": False, "data": [], "errors": ["Method not supported by the stub"]}
+    documents = payload.get("methodProperties", {}).get("Documents", [])
+    if len(documents) > 100:
+        return {"success": False, "data": [], "errors": ["Too many documents"]}
+
+    app.state.requests += 1
+    app.state.documents += len(documents)
+    await asyncio.sleep(app.state.latency_ms / 1000)
+    return {
+        "success": True,
+        "data": [
+            {"Number": document["DocumentNumber"], "StatusCode": status_code_for(document["DocumentNumber"])}
+            for document in documents
+        ],
+        "errors": [],
+    }
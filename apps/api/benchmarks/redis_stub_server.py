@@ -0,0 +1,135 @@
+"""
+Local stand-in for a Redis server, with just the commands the order page cache uses.
+
+    python -m benchmarks.redis_stub_server --port 6380
+    APP_ORDER_PAGE_CACHE_URL=redis://127.0.0.1:6380/0 uvicorn main:app --workers 4
+
+Speaks RESP2 (and HELLO 3, which current clients send first) over TCP and keeps
+everything in memory, in one keyspace for all databases. Supports HELLO, PING, GET, SET
+(EX, PX, NX, XX), INCR, INCRBY, DEL, FLUSHDB, SELECT and CLIENT; anything else is answered
+with an error.
+"""
+import argparse
+import asyncio
+import time
+from typing import Dict, List, Optional, Tuple
+
+# key -> (value, expiry as a monotonic timestamp or None)
+store: Dict[bytes, Tuple[bytes, Optional[float]]] = {}
+
+
+def encode(reply, protocol: int = 2) -> bytes:
+    if isinstance(reply, dict):
+        # HELLO reply: a map in RESP3, a flat array of keys and values in RESP2
+        items = b"".join(encode(key, protocol) + encode(value, protocol) for key, value in reply.items())
+        if protocol == 3:
+            return b"%%%d\r\n%s" % (len(reply), items)
+        return b"*%d\r\n%s" % (len(reply) * 2, items)
+    if reply is None:
+        return b"_\r\n" if protocol == 3 else b"$-1\r\n"
+    if isinstance(reply, int):
+        return b":%d\r\n" % reply
+    if isinstance(reply, Exception):
+        return b"-ERR %s\r\n" % str(reply).encode("utf-8")
+    if isinstance(reply, str):
+        return b"+%s\r\n" % reply.encode("utf-8")
+    return b"$%d\r\n%s\r\n" % (len(reply), reply)
+
+
+def lookup(key: bytes) -> Optional[bytes]:
+    entry = store.get(key)
+    if entry is None:
+        return None
+    value, expires_at = entry
+    if expires_at is not None and expires_at <= time.monotonic():
+        del store[key]
+        return None
+    return value
+
+
+def execute(command: List[bytes]):
+    name, args = command[0].upper(), command[1:]
+    if name == b"PING":
+        return "PONG"
+    if name in (b"SELECT", b"CLIENT"):
+        return "OK"
+    if name == b"HELLO":
+        protocol = int(args[0]) if args else 2
+        if protocol not in (2, 3):
+            return ValueError("NOPROTO unsupported protocol version")
+        return {b"server": b"redis", b"version": b"7.2.0", b"proto": protocol, b"mode": b"standalone"}
+    if name == b"GET":
+        return lookup(args[0])
+    if name == b"SET":
+        key, value, options = args[0], args[1], [option.upper() for option in args[2:]]
+        exists = lookup(key) is not None
+        if (b"NX" in options and exists) or (b"XX" in options and not exists):
+            return None
+        expires_at = None
+        for unit, seconds in ((b"EX", 1), (b"PX", 0.001)):
+            if unit in options:
+                expires_at = time.monotonic() + int(options[options.index(unit) + 1]) * seconds
+        store[key] = (value, expires_at)
+        return "OK"
+    if name in (b"INCR", b"INCRBY"):
+        value = int(lookup(args[0]) or 0) + (int(args[1]) if name == b"INCRBY" else 1)
+        store[args[0]] = (str(value).encode("ascii"), store.get(args[0], (None, None))[1])
+        return value
+    if name == b"DEL":
+        return sum(store.pop(key, None) is not None for key in args)
+    if name == b"FLUSHDB":
+        store.clear()
+        return "OK"
+    return ValueError(f"unknown command '{name.decode('utf-8', 'replace')}'")
+
+
+async def read_command(reader: asyncio.StreamReader) -> Optional[List[bytes]]:
+    header = await reader.readline()
+    if not header:
+        return None
+    if not header.startswith(b"*"):
+        # Inline command, as sent by telnet or redis-cli in some modes
+        return header.split()
+    command = []
+    for _ in range(int(header[1:])):
+        length = int((await reader.readline())[1:])
+        command.append((await reader.readexactly(length + 2))[:-2])
+    return command
+
+
+async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    protocol = 2
+    try:
+        while (command := await read_command(reader)) is not None:
+            if command:
+                try:
+                    reply = execute(command)
+                except (IndexError, ValueError) as e:
+                    reply = ValueError(str(e) or "syntax error")
+                if isinstance(reply, dict):
+                    protocol = reply[b"proto"]
+                writer.write(encode(reply, protocol))
+                await writer.drain()
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(host: str, port: int) -> None:
+    server = await asyncio.start_server(handle, host, port)
+    print(f"Redis stub listening on {host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6380)
+    args = parser.parse_args()
+    asyncio.run(serve(args.host, args.port))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+import random
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import Engine, insert, text
+
+from db.base import Base
+from db.models import OrderModel, UserModel, UserOrderModel
+
+STATUSES = [None, "created", "in_transit", "arrived", "received", "refused", "returned"]
+WORDS = ["phone", "case", "charger", "book", "lamp", "shoes", "jacket", "cable", "mouse", "keyboard",
+         "monitor", "chair", "desk", "kettle", "blender", "toy", "watch", "bag", "camera", "speaker"]
+BASE_TIME = datetime(2025, 1, 1)
+
+
+def user_email(user_id: int) -> str:
+    return f"user{user_id}@bench.example.com"
+
+
+def create_schema(engine: Engine) -> None:
+    """Recreate all tables (and their indexes) from the models."""
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+
+
+def seed(engine: Engine, users: int, orders: int, chunk_size: int = 50_000, seed_value: int = 42) -> None:
+    """
+    Fill a fresh schema with `users` users and `orders` orders, dealt round-robin between the users.
+    Order i is created i seconds after BASE_TIME and has a random name, description and status.
+    """
+    rng = random.Random(seed_value)
+    started = time.perf_counter()
+    create_schema(engine)
+    with engine.begin() as conn:
+        if engine.dialect.name == "sqlite":
+            conn.execute(text("PRAGMA synchronous = OFF"))
+        conn.execute(insert(UserModel.__table__), [
+            {"id": user_id, "email": user_email(user_id), "name": f"User {user_id}", "isActive": True,
+             "createdAt": BASE_TIME, "updatedAt": BASE_TIME}
+            for user_id in range(1, users + 1)
+        ])
+        for start in range(1, orders + 1, chunk_size):
+            ids = range(start, min(start + chunk_size, orders + 1))
+            order_rows, link_rows = [], []
+            for order_id in ids:
+                created_at = BASE_TIME + timedelta(seconds=order_id)
+                order_row = {
+                    "id": order_id,
+                    "name": f"{rng.choice(WORDS)} {rng.choice(WORDS)}",
+                    "externalId": f"2045{order_id:010d}",
+                    "status": rng.choice(STATUSES),
+                    "description": f"{rng.choice(WORDS)} for {rng.choice(WORDS)}",
+                    "createdAt": created_at,
+                    "updatedAt": created_at,
+                }
+                order_rows.append(order_row)
+                link_rows.append({
+                    "id": order_id,
+                    "UserId": (order_id - 1) % users + 1,
+                    "OrderId": order_id,
+                    "orderCreatedAt": created_at,
+                    "orderName": order_row["name"],
+                    "orderStatus": order_row["status"],
+                    "createdAt": created_at,
+                    "updatedAt": created_at,
+                })
+            conn.execute(insert(OrderModel.__table__), order_rows)
+            conn.execute(insert(UserOrderModel.__table__), link_rows)
+    with engine.begin() as conn:
+        if engine.dialect.name == "postgresql":
+            # Rows were inserted with explicit ids, move the sequences past them for later inserts
+            for table in (UserModel.__table__, OrderModel.__table__, UserOrderModel.__table__):
+                conn.execute(text(
+                    f"SELECT setval(pg_get_serial_sequence('\"{table.name}\"', 'id'), "
+                    f"(SELECT coalesce(max(id), 1) FROM \"{table.name}\"))"
+                ))
+        conn.execute(text("ANALYZE"))
+    print(f"seeded {users} users / {orders} orders in {time.perf_counter() - started:.1f}s")
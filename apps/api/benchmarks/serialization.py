@@ -0,0 +1,96 @@
+"""
+Per-row cost of turning a page of OrderModel rows into a JSON response body.
+
+    python -m benchmarks.serialization --rows 10 100 1000
+
+"before" is the original path: OrderSchema.from_orm per row, AllOrdersSchema,
+then FastAPI's jsonable_encoder and the stdlib json module. "after" is what the
+routers do now: one TypeAdapter validation for the page and one model_dump_json.
+No database is needed; the rows are transient ORM instances.
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+import warnings
+from datetime import timedelta
+from typing import Callable, List
+
+from fastapi.encoders import jsonable_encoder
+
+from app.helpers.json_helper import dump_json, orjson, type_adapter
+from app.models.order_schema import AllOrdersSchema, OrderSchema
+from benchmarks.seed import BASE_TIME, STATUSES, WORDS
+from db.models import OrderModel
+
+
+def make_rows(count: int) -> List[OrderModel]:
+    return [
+        OrderModel(
+            id=i,
+            name=f"{WORDS[i % len(WORDS)]} {i}",
+            externalId=f"2045{i:010d}",
+            status=STATUSES[i % len(STATUSES)],
+            description=" ".join(WORDS[:i % 5]) or None,
+            createdAt=BASE_TIME + timedelta(seconds=i),
+            updatedAt=BASE_TIME + timedelta(seconds=i),
+        )
+        for i in range(1, count + 1)
+    ]
+
+
+def before(rows: List[OrderModel]) -> bytes:
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        page = AllOrdersSchema(orders=[OrderSchema.from_orm(row) for row in rows], total=len(rows))
+    # What FastAPI's default JSONResponse does with the endpoint's return value
+    return json.dumps(jsonable_encoder(page), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def after(rows: List[OrderModel]) -> bytes:
+    page = AllOrdersSchema(
+        orders=type_adapter(List[OrderSchema]).validate_python(rows, from_attributes=True), total=len(rows)
+    )
+    return dump_json(page)
+
+
+def after_orjson(rows: List[OrderModel]) -> bytes:
+    page = AllOrdersSchema(
+        orders=type_adapter(List[OrderSchema]).validate_python(rows, from_attributes=True), total=len(rows)
+    )
+    return orjson.dumps(page.model_dump())
+
+
+def per_row_us(serialize: Callable[[List[OrderModel]], bytes], rows: List[OrderModel], repeat: int) -> float:
+    serialize(rows)
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        serialize(rows)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) / len(rows) * 1e6
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10, 100, 1000], help="page sizes to measure")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    variants = {"before": before, "after": after}
+    if orjson is not None:
+        variants["after+orjson"] = after_orjson
+
+    print(f"{'rows':>6}  " + "  ".join(f"{name:>14}" for name in variants) + "   (us per row)")
+    for count in args.rows:
+        rows = make_rows(count)
+        # Both paths must produce the same document
+        assert json.loads(before(rows)) == json.loads(after(rows))
+        timings = [per_row_us(serialize, rows, args.repeat) for serialize in variants.values()]
+        print(f"{count:>6}  " + "  ".join(f"{timing:>14.2f}" for timing in timings))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,68 @@
+"""
+Throughput of one TrackingRefresher pass against the local Nova Poshta stub.
+
+    python -m benchmarks.tracking_refresh --orders 100000 --concurrency 8 --rate-limit 50
+
+The stub runs in-process through httpx's ASGI transport, unless --carrier-url points
+at a running stub (or any compatible server).
+"""
+import argparse
+import asyncio
+import sys
+import time
+
+import httpx
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.services.carrier_client import NovaPoshtaClient
+from app.services.tracking_service import TrackingRefresher
+from benchmarks import np_stub_server
+from benchmarks.seed import seed
+
+
+async def run(args: argparse.Namespace) -> None:
+    engine = create_async_engine(args.url.replace("sqlite://", "sqlite+aiosqlite://", 1))
+    np_stub_server.app.state.latency_ms = args.latency_ms
+    transport = None if args.carrier_url else httpx.ASGITransport(app=np_stub_server.app)
+    carrier = NovaPoshtaClient(args.carrier_url or "http://np-stub/", api_key="bench", transport=transport)
+    refresher = TrackingRefresher(
+        async_sessionmaker(engine, expire_on_commit=False),
+        carrier,
+        batch_size=args.batch_size,
+        concurrency=args.concurrency,
+        rate_limit=args.rate_limit,
+    )
+
+    for attempt in ("first pass", "second pass"):
+        requests_before = np_stub_server.app.state.requests
+        started = time.perf_counter()
+        updated = await refresher.run_once()
+        elapsed = time.perf_counter() - started
+        requests = np_stub_server.app.state.requests - requests_before
+        print(f"{attempt}: {updated} orders updated, {requests} carrier requests in {elapsed:.2f}s "
+              f"({updated / elapsed:.0f} orders/s)")
+
+    await refresher.stop()
+    await engine.dispose()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="sqlite:///./bench_orders.db", help="synchronous database URL")
+    parser.add_argument("--orders", type=int, default=100_000)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--rate-limit", type=float, default=50.0, help="carrier requests per second")
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="simulated carrier latency")
+    parser.add_argument("--carrier-url", help="use a running stub instead of the in-process one")
+    args = parser.parse_args()
+
+    # Seeded orders get random statuses, so roughly half are still in flight
+    seed(create_engine(args.url), users=100, orders=args.orders)
+    asyncio.run(run(args))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
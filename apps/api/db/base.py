@@ -1,16 +1,21 @@
 from datetime import datetime
 from sqlalchemy import DateTime, func
+from sqlalchemy.dialects import sqlite
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import Mapped, mapped_column
 
+# SQLite fills func.now() defaults with CURRENT_TIMESTAMP, which has no microseconds;
+# bound datetimes use the same text format so that comparisons and seeded rows agree.
+Timestamp = DateTime().with_variant(sqlite.DATETIME(truncate_microseconds=True), "sqlite")
+
 class TimestampMixin:
     """Mixin that adds timestamp fields to models."""
     
     createdAt: Mapped[datetime] = mapped_column(
-        DateTime(), default=func.now(), nullable=False
+        Timestamp, default=func.now(), nullable=False
     )
     updatedAt: Mapped[datetime] = mapped_column(
-        DateTime(), default=func.now(), onupdate=func.now(), nullable=True
+        Timestamp, default=func.now(), onupdate=func.now(), nullable=True
     )
 
 Base = declarative_base()
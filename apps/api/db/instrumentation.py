@@ -0,0 +1,59 @@
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Any, Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+class QueryStats:
+    """SQL statements executed on behalf of one request."""
+
+    def __init__(self, track_statements: bool = False) -> None:
+        """
+        :param track_statements: also count executions per statement text, to spot N+1 patterns.
+        """
+        self.count = 0
+        self.duration = 0.0
+        self.statements: Optional[Counter] = Counter() if track_statements else None
+
+    def record(self, statement: str, seconds: float) -> None:
+        self.count += 1
+        self.duration += seconds
+        if self.statements is not None:
+            self.statements[statement] += 1
+
+
+# Stats of the request being handled; SQLAlchemy runs the cursor events in a greenlet
+# spawned from the request's task, which inherits the task's context
+current_query_stats: ContextVar[Optional[QueryStats]] = ContextVar("current_query_stats", default=None)
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """
+    Record every statement executed through the engine into `current_query_stats`, if one is set.
+    :param engine: engine created by setup_db.
+    """
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool) -> None:
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool) -> None:
+        started = conn.info["query_started"].pop()
+        stats = current_query_stats.get()
+        if stats is not None:
+            stats.record(statement, time.perf_counter() - started)
+
+    @event.listens_for(engine.sync_engine, "handle_error")
+    def handle_error(exception_context: Any) -> None:
+        # after_cursor_execute does not fire for failed statements
+        connection = exception_context.connection
+        if connection is None or not connection.info.get("query_started"):
+            return
+        started = connection.info["query_started"].pop()
+        stats = current_query_stats.get()
+        if stats is not None and exception_context.statement is not None:
+            stats.record(exception_context.statement, time.perf_counter() - started)
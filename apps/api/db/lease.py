@@ -0,0 +1,89 @@
+import os
+import socket
+import time
+import uuid
+from typing import Optional
+
+from sqlalchemy import insert, or_, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from db.models import JobLeaseModel
+from db.writer import run_write
+
+
+class DbLease:
+    """
+    Named lease in the job_lease table, so that one process at a time runs a background
+    job that every worker process starts.
+
+    The holder keeps the lease by acquiring it again before it expires, and a holder
+    that dies loses it once it expires. A released lease can stay blocked until a
+    given time, e.g. when the next run of the job is due. Expiry times are Unix times
+    of the processes, so their clocks must roughly agree.
+    """
+
+    def __init__(self, session_factory: async_sessionmaker[AsyncSession], name: str, holder: Optional[str] = None):
+        """
+        :param session_factory: factory for read-write database sessions.
+        :param name: the job the lease is for.
+        :param holder: identifies this process, by default its host, pid and a random suffix.
+        """
+        self.session_factory = session_factory
+        self.name = name
+        self.holder = holder or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._row_exists = False
+
+    async def acquire(self, duration: float) -> bool:
+        """
+        Take the lease if it is free, or extend it if this process holds it.
+        :param duration: seconds from now until the lease expires.
+        :return: whether this process holds the lease.
+        """
+        now = time.time()
+
+        async def take(db_session: AsyncSession) -> bool:
+            result = await db_session.execute(
+                update(JobLeaseModel)
+                .where(JobLeaseModel.name == self.name)
+                .where(or_(JobLeaseModel.holder == self.holder, JobLeaseModel.expiresAt < now))
+                .values(holder=self.holder, expiresAt=now + duration)
+                .execution_options(synchronize_session=False)
+            )
+            return result.rowcount > 0
+
+        async def create(db_session: AsyncSession) -> bool:
+            await db_session.execute(
+                insert(JobLeaseModel).values(name=self.name, holder=self.holder, expiresAt=now + duration)
+            )
+            return True
+
+        async with self.session_factory() as db_session:
+            if await run_write(db_session, take):
+                self._row_exists = True
+                return True
+            if self._row_exists:
+                return False
+            # First use of the lease: create its row, unless another process just did
+            self._row_exists = True
+            try:
+                return await run_write(db_session, create)
+            except IntegrityError:
+                return False
+
+    async def release(self, blocked_until: Optional[float] = None) -> None:
+        """
+        Give the lease up, if this process holds it.
+        :param blocked_until: Unix time before which no process can take it, none means right away.
+        """
+
+        async def give_up(db_session: AsyncSession) -> None:
+            await db_session.execute(
+                update(JobLeaseModel)
+                .where(JobLeaseModel.name == self.name, JobLeaseModel.holder == self.holder)
+                .values(holder=None, expiresAt=blocked_until if blocked_until is not None else time.time())
+                .execution_options(synchronize_session=False)
+            )
+
+        async with self.session_factory() as db_session:
+            await run_write(db_session, give_up)
@@ -1,20 +1,38 @@
-from typing import AsyncGenerator
+from typing import Any, AsyncGenerator, Hashable, Optional
 
 import warnings
 from fastapi import FastAPI
 from starlette.requests import Request
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
     AsyncSession,
     async_sessionmaker,
     create_async_engine,
 )
 
+from db.instrumentation import instrument_engine
+from db.pool import InstrumentedAsyncAdaptedQueuePool
+from db.replicas import ReadSessionRouter
+from db.writer import SingleWriter
 from settings import settings
 
 
+def get_session_key(request: Request) -> Optional[Hashable]:
+    """
+    Key of the caller for read-your-writes, see ReadSessionRouter.
+    Routes set it in `request.state.db_session_key` before their session dependency is resolved.
+    :param request: current request.
+    :return: the key, None for requests that did not set one.
+    """
+    return getattr(request.state, "db_session_key", None)
+
+
 async def get_db_session(request: Request) -> AsyncGenerator[AsyncSession, None]:
     """
     Create and get database session.
+    Once it is committed, the caller's reads go to the primary for a while, see ReadSessionRouter.
     :param request: current request.
     :yield: database session.
     """
@@ -25,6 +43,97 @@ async def get_db_session(request: Request) -> AsyncGenerator[AsyncSession, None]
     finally:
         await session.commit()
         await session.close()
+        key = get_session_key(request)
+        if key is not None:
+            request.app.state.db_readonly_session_factory.record_write(key)
+
+
+async def get_readonly_db_session(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Create and get database session for requests that only read.
+    Nothing is committed: closing the session just ends its transaction,
+    which on PostgreSQL is started as READ ONLY.
+    The session is on a read replica, if there are any and the caller has not written recently.
+    :param request: current request.
+    :yield: database session.
+    """
+    session: AsyncSession = request.app.state.db_readonly_session_factory(get_session_key(request))
+
+    try:
+        yield session
+    finally:
+        await session.close()
+
+
+def enforce_foreign_keys(engine: AsyncEngine) -> None:
+    """
+    Turn on foreign key enforcement, and with it ON DELETE CASCADE, on every connection
+    of an SQLite engine; SQLite leaves it off unless each connection asks for it.
+    :param engine: engine on an SQLite database.
+    """
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def on_connect(dbapi_connection: Any, connection_record: Any) -> None:
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
+
+def configure_sqlite(engine: AsyncEngine, begin: str = "BEGIN", query_only: bool = False) -> None:
+    """
+    Apply the SQLite profile to every connection of an engine.
+    :param engine: engine on an SQLite database file.
+    :param begin: statement that starts each transaction; BEGIN IMMEDIATE takes the write lock up front.
+    :param query_only: make the connections refuse writes.
+    """
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def on_connect(dbapi_connection: Any, connection_record: Any) -> None:
+        # Transactions are started by the "begin" hook below instead of the driver,
+        # which does not start them before a SAVEPOINT
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f"PRAGMA busy_timeout={settings.sqlite_busy_timeout}")
+        # Readers no longer block the writer nor the other way round, and a commit needs no fsync
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA cache_size={settings.sqlite_cache_size}")
+        cursor.execute(f"PRAGMA mmap_size={settings.sqlite_mmap_size}")
+        if query_only:
+            cursor.execute("PRAGMA query_only=ON")
+        cursor.close()
+
+    @event.listens_for(engine.sync_engine, "begin")
+    def on_begin(connection: Any) -> None:
+        connection.exec_driver_sql(begin)
+
+
+def is_sqlite_file(uri: str) -> bool:
+    """
+    :param uri: database URL.
+    :return: whether it is an SQLite database file, as opposed to another backend or in-memory SQLite.
+    """
+    url = make_url(uri)
+    return url.get_backend_name() == "sqlite" and url.database not in (None, "", ":memory:")
+
+
+def get_pool_options(uri: str) -> dict:
+    """
+    Connection pool arguments of create_async_engine for a database URL.
+    :param uri: database URL.
+    :return: the configured QueuePool, or nothing for in-memory SQLite, which lives in a
+        single connection and keeps SQLAlchemy's StaticPool.
+    """
+    if make_url(uri).get_backend_name() == "sqlite" and not is_sqlite_file(uri):
+        return {}
+    return dict(
+        poolclass=InstrumentedAsyncAdaptedQueuePool,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_recycle=settings.db_pool_recycle,
+        pool_pre_ping=settings.db_pool_pre_ping,
+    )
 
 
 def setup_db(app: FastAPI) -> None:  # pragma: no cover
@@ -39,13 +148,82 @@ def setup_db(app: FastAPI) -> None:  # pragma: no cover
         warnings.warn("Warning: no connection uri set.", UserWarning)
         return
 
+    sqlite_file = is_sqlite_file(settings.db_connection_uri)
+    pool_options = get_pool_options(settings.db_connection_uri)
     engine = create_async_engine(
         settings.db_connection_uri,
         echo=settings.echo,
+        **pool_options,
     )
+    instrument_engine(engine)
+    # Every engine by role, for dispose_db and the pool metrics
+    engines = {"primary": engine}
+    writer = None
+    # SQLite and the other backends already start transactions lazily (deferred), on the first statement
+    readonly_engine = engine
+    if engine.dialect.name == "postgresql":
+        readonly_engine = engine.execution_options(postgresql_readonly=True)
+    elif sqlite_file and settings.sqlite_high_concurrency:
+        configure_sqlite(engine)
+        readonly_engine = create_async_engine(
+            settings.db_connection_uri,
+            echo=settings.echo,
+            **dict(pool_options, pool_size=settings.sqlite_reader_pool_size, max_overflow=0),
+        )
+        configure_sqlite(readonly_engine, query_only=True)
+        # The one connection that writes, used by the writer task alone
+        writer_engine = create_async_engine(
+            settings.db_connection_uri,
+            echo=settings.echo,
+            pool_size=1,
+            max_overflow=0,
+        )
+        configure_sqlite(writer_engine, begin="BEGIN IMMEDIATE")
+        for name, sqlite_engine in (("sqliteReader", readonly_engine), ("sqliteWriter", writer_engine)):
+            instrument_engine(sqlite_engine)
+            engines[name] = sqlite_engine
+        writer = SingleWriter(
+            async_sessionmaker(writer_engine, expire_on_commit=False),
+            max_batch_size=settings.sqlite_write_batch_size,
+        )
     session_factory = async_sessionmaker(
         engine,
         expire_on_commit=False,
+        # Picked up by db.writer.run_write
+        info={"writer": writer} if writer is not None else None,
+    )
+    replica_engines = []
+    for number, replica_uri in enumerate(settings.db_replica_uris, start=1):
+        replica_engine = create_async_engine(replica_uri, echo=settings.echo, **get_pool_options(replica_uri))
+        instrument_engine(replica_engine)
+        engines[f"replica{number}"] = replica_engine
+        if replica_engine.dialect.name == "postgresql":
+            replica_engine = replica_engine.execution_options(postgresql_readonly=True)
+        elif is_sqlite_file(replica_uri) and settings.sqlite_high_concurrency:
+            configure_sqlite(replica_engine, query_only=True)
+        replica_engines.append(replica_engine)
+    readonly_session_factory = ReadSessionRouter(
+        readonly_engine,
+        replica_engines,
+        strategy=settings.db_replica_strategy,
+        read_your_writes_window=settings.db_read_your_writes_window,
     )
+    for sqlite_engine in engines.values():
+        if sqlite_engine.dialect.name == "sqlite":
+            enforce_foreign_keys(sqlite_engine)
     app.state.db_engine = engine
+    app.state.db_engines = engines
+    app.state.db_writer = writer
     app.state.db_session_factory = session_factory
+    app.state.db_readonly_session_factory = readonly_session_factory
+
+
+async def dispose_db(app: FastAPI) -> None:  # pragma: no cover
+    """
+    Stop the writer and close the connections opened by setup_db.
+    :param app: fastAPI application.
+    """
+    if app.state.db_writer is not None:
+        await app.state.db_writer.stop()
+    for engine in app.state.db_engines.values():
+        await engine.dispose()
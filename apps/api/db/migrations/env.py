@@ -3,6 +3,7 @@ from logging.config import fileConfig
 
 from sqlalchemy import engine_from_config
 from sqlalchemy import pool
+from sqlalchemy.schema import CreateIndex
 
 from alembic import context
 
@@ -28,6 +29,18 @@ from db.models import users_model, orders_model  # Import all models
 
 target_metadata = Base.metadata
 
+
+def include_name(name, type_, parent_names):
+    """Keep autogenerate from dropping the full-text search objects, which are not in the models."""
+    return name not in orders_model.SEARCH_OBJECT_NAMES
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    """Leave out indexes the models only create on other databases (Index.ddl_if), e.g. the Postgres NULLS FIRST ones."""
+    if type_ == "index" and not reflected and object._ddl_if is not None:
+        return object._ddl_if._should_execute(CreateIndex(object), object, context.get_bind())
+    return True
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -51,6 +64,8 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_name=include_name,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -78,7 +93,8 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection, target_metadata=target_metadata,
+            include_name=include_name, include_object=include_object,
         )
 
         with context.begin_transaction():
@@ -0,0 +1,39 @@
+"""order listing indexes
+
+Revision ID: d64812590fc7
+Revises: 9d864dd7754c
+Create Date: 2026-10-18 11:52:40.512734
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd64812590fc7'
+down_revision: Union[str, None] = '9d864dd7754c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_order_createdAt_id', 'order', ['createdAt', 'id'], unique=False)
+    op.create_index('ix_order_name_id', 'order', ['name', 'id'], unique=False)
+    # NULL statuses sort first in the listing; only Postgres needs it spelled out in the index
+    if op.get_bind().dialect.name == 'postgresql':
+        op.create_index('ix_order_status_nulls_first_id', 'order', [sa.text('status NULLS FIRST'), 'id'], unique=False)
+    else:
+        op.create_index('ix_order_status_id', 'order', ['status', 'id'], unique=False)
+    op.create_index('ix_user_orders_OrderId_UserId', 'user_orders', ['OrderId', 'UserId'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_user_orders_OrderId_UserId', table_name='user_orders')
+    if op.get_bind().dialect.name == 'postgresql':
+        op.drop_index('ix_order_status_nulls_first_id', table_name='order')
+    else:
+        op.drop_index('ix_order_status_id', table_name='order')
+    op.drop_index('ix_order_name_id', table_name='order')
+    op.drop_index('ix_order_createdAt_id', table_name='order')
@@ -0,0 +1,67 @@
+"""order full-text search
+
+Revision ID: 6b8d1d5cf964
+Revises: d64812590fc7
+Create Date: 2026-10-18 14:05:12.304118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6b8d1d5cf964'
+down_revision: Union[str, None] = 'd64812590fc7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Other backends get no search index, OrderService.search_orders falls back to a LIKE match there
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        # Generated column: filled for existing rows here, and by Postgres on every write
+        op.execute("""
+            ALTER TABLE "order" ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+                setweight(to_tsvector('simple', coalesce(name, '')), 'A') ||
+                setweight(to_tsvector('simple', coalesce(description, '')), 'B')
+            ) STORED
+        """)
+        op.create_index('ix_order_search_vector', 'order', ['search_vector'], unique=False, postgresql_using='gin')
+    elif dialect == 'sqlite':
+        op.execute("""
+            CREATE VIRTUAL TABLE order_fts USING fts5(
+                name, description, content='order', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+            )
+        """)
+        op.execute("""
+            CREATE TRIGGER order_fts_ai AFTER INSERT ON "order" BEGIN
+                INSERT INTO order_fts(rowid, name, description) VALUES (new.id, new.name, new.description);
+            END
+        """)
+        op.execute("""
+            CREATE TRIGGER order_fts_ad AFTER DELETE ON "order" BEGIN
+                INSERT INTO order_fts(order_fts, rowid, name, description) VALUES ('delete', old.id, old.name, old.description);
+            END
+        """)
+        op.execute("""
+            CREATE TRIGGER order_fts_au AFTER UPDATE OF name, description ON "order" BEGIN
+                INSERT INTO order_fts(order_fts, rowid, name, description) VALUES ('delete', old.id, old.name, old.description);
+                INSERT INTO order_fts(rowid, name, description) VALUES (new.id, new.name, new.description);
+            END
+        """)
+        # Index the orders that already exist
+        op.execute("INSERT INTO order_fts(order_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        op.drop_index('ix_order_search_vector', table_name='order', postgresql_using='gin')
+        op.drop_column('order', 'search_vector')
+    elif dialect == 'sqlite':
+        op.execute("DROP TRIGGER order_fts_au")
+        op.execute("DROP TRIGGER order_fts_ad")
+        op.execute("DROP TRIGGER order_fts_ai")
+        op.execute("DROP TABLE order_fts")
@@ -0,0 +1,34 @@
+"""job lease
+
+Revision ID: dd51826e3c6e
+Revises: 6b8d1d5cf964
+Create Date: 2026-10-18 15:20:41.118305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'dd51826e3c6e'
+down_revision: Union[str, None] = '6b8d1d5cf964'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'job_lease',
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('holder', sa.String(length=200), nullable=True),
+        sa.Column('expiresAt', sa.Float(), nullable=False),
+        sa.Column('createdAt', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.Column('updatedAt', sa.DateTime(), nullable=True, server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint('name'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('job_lease')
@@ -0,0 +1,26 @@
+"""order row version
+
+Revision ID: 4f2a9c7e1b30
+Revises: dd51826e3c6e
+Create Date: 2026-10-18 15:45:09.640271
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4f2a9c7e1b30'
+down_revision: Union[str, None] = 'dd51826e3c6e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('order', sa.Column('version', sa.Integer(), nullable=False, server_default='1'))
+
+
+def downgrade() -> None:
+    op.drop_column('order', 'version')
@@ -0,0 +1,65 @@
+"""user_orders listing sort columns
+
+Revision ID: 7c3e5a1d9b42
+Revises: 4f2a9c7e1b30
+Create Date: 2026-10-18 16:30:27.318402
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c3e5a1d9b42'
+down_revision: Union[str, None] = '4f2a9c7e1b30'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('user_orders', sa.Column('orderCreatedAt', sa.DateTime(), nullable=True))
+    op.add_column('user_orders', sa.Column('orderName', sa.String(length=200), nullable=True))
+    op.add_column('user_orders', sa.Column('orderStatus', sa.String(length=50), nullable=True))
+    user_orders = sa.table('user_orders', sa.column('OrderId'), sa.column('orderCreatedAt'), sa.column('orderName'), sa.column('orderStatus'))
+    order = sa.table('order', sa.column('id'), sa.column('createdAt'), sa.column('name'), sa.column('status'))
+
+    def copy_of(name):
+        return sa.select(order.c[name]).where(order.c.id == user_orders.c.OrderId).scalar_subquery()
+
+    op.execute(user_orders.update().values(
+        orderCreatedAt=copy_of('createdAt'), orderName=copy_of('name'), orderStatus=copy_of('status'),
+    ))
+    with op.batch_alter_table('user_orders') as batch_op:
+        batch_op.alter_column('orderCreatedAt', existing_type=sa.DateTime(), nullable=False)
+        batch_op.alter_column('orderName', existing_type=sa.String(length=200), nullable=False)
+
+    op.create_index('ix_user_orders_UserId_orderCreatedAt_OrderId', 'user_orders', ['UserId', 'orderCreatedAt', 'OrderId'], unique=False)
+    op.create_index('ix_user_orders_UserId_orderName_OrderId', 'user_orders', ['UserId', 'orderName', 'OrderId'], unique=False)
+    # NULL statuses sort first in the listing; only Postgres needs it spelled out in the index
+    if op.get_bind().dialect.name == 'postgresql':
+        op.create_index('ix_user_orders_UserId_orderStatus_nulls_first_OrderId', 'user_orders', ['UserId', sa.text('"orderStatus" NULLS FIRST'), 'OrderId'], unique=False)
+        op.drop_index('ix_order_status_nulls_first_id', table_name='order')
+    else:
+        op.create_index('ix_user_orders_UserId_orderStatus_OrderId', 'user_orders', ['UserId', 'orderStatus', 'OrderId'], unique=False)
+        op.drop_index('ix_order_status_id', table_name='order')
+    # The listing no longer reads the orders in sort order, these only slowed down writes
+    op.drop_index('ix_order_name_id', table_name='order')
+    op.drop_index('ix_order_createdAt_id', table_name='order')
+
+
+def downgrade() -> None:
+    op.create_index('ix_order_createdAt_id', 'order', ['createdAt', 'id'], unique=False)
+    op.create_index('ix_order_name_id', 'order', ['name', 'id'], unique=False)
+    if op.get_bind().dialect.name == 'postgresql':
+        op.create_index('ix_order_status_nulls_first_id', 'order', [sa.text('status NULLS FIRST'), 'id'], unique=False)
+        op.drop_index('ix_user_orders_UserId_orderStatus_nulls_first_OrderId', table_name='user_orders')
+    else:
+        op.create_index('ix_order_status_id', 'order', ['status', 'id'], unique=False)
+        op.drop_index('ix_user_orders_UserId_orderStatus_OrderId', table_name='user_orders')
+    op.drop_index('ix_user_orders_UserId_orderName_OrderId', table_name='user_orders')
+    op.drop_index('ix_user_orders_UserId_orderCreatedAt_OrderId', table_name='user_orders')
+    op.drop_column('user_orders', 'orderStatus')
+    op.drop_column('user_orders', 'orderName')
+    op.drop_column('user_orders', 'orderCreatedAt')
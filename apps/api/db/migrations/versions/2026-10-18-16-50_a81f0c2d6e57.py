@@ -0,0 +1,26 @@
+"""user row version
+
+Revision ID: a81f0c2d6e57
+Revises: 7c3e5a1d9b42
+Create Date: 2026-10-18 16:50:42.905113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a81f0c2d6e57'
+down_revision: Union[str, None] = '7c3e5a1d9b42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('user', sa.Column('version', sa.Integer(), nullable=False, server_default='1'))
+
+
+def downgrade() -> None:
+    op.drop_column('user', 'version')
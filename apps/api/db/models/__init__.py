@@ -7,8 +7,9 @@ from pathlib import Path
 from .users_model import UserModel
 from .orders_model import OrderModel
 from .user_orders_model import UserOrderModel
+from .job_lease_model import JobLeaseModel
 
-__all__ = ["UserModel", "OrderModel", "UserOrderModel"]
+__all__ = ["UserModel", "OrderModel", "UserOrderModel", "JobLeaseModel"]
 
 
 def load_all_models() -> None:
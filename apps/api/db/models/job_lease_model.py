@@ -0,0 +1,17 @@
+from typing import Optional
+
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql.sqltypes import Float, String
+
+from db.base import BaseModel
+
+class JobLeaseModel(BaseModel):
+    """Named lease that lets one process at a time run a background job, see db.lease.DbLease."""
+
+    __tablename__ = "job_lease"
+
+    name: Mapped[str] = mapped_column(String(length=100), primary_key=True)
+    # Process holding the lease, NULL once it is released
+    holder: Mapped[Optional[str]] = mapped_column(String(length=200), nullable=True)
+    # Unix time until which the holder keeps the lease, or nobody takes it after a release
+    expiresAt: Mapped[float] = mapped_column(Float, nullable=False)
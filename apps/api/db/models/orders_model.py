@@ -1,6 +1,6 @@
-from sqlalchemy import UniqueConstraint
+from sqlalchemy import DDL, UniqueConstraint, column, event
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy.sql.sqltypes import String
+from sqlalchemy.sql.sqltypes import Integer, String
 from typing import List, TYPE_CHECKING
 
 from db.base import BaseModel
@@ -20,10 +20,57 @@ class OrderModel(BaseModel):
     externalId: Mapped[str] = mapped_column(String(length=200), nullable=False)
     status: Mapped[str] = mapped_column(String(length=50), nullable=True)
     description: Mapped[str] = mapped_column(String(length=500), nullable=True)
+    # Row version, incremented by every UPDATE statement; unlike updatedAt (one second
+    # resolution on SQLite) it tells apart every change, whichever process made it
+    version: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=1, server_default="1", onupdate=column("version") + 1
+    )
     
     # Relationships
     user_orders: Mapped[List["UserOrderModel"]] = relationship(
         "UserOrderModel", back_populates="order", cascade="all, delete-orphan"
     )
 
-    __table_args__ = (UniqueConstraint("externalId"),)
+    __table_args__ = (
+        UniqueConstraint("externalId"),
+        # The listing sorts through copies of the sort columns in user_orders, see UserOrderModel
+    )
+
+
+# Full-text search over name and description, maintained by the database itself:
+# SQLite keeps an FTS5 external-content table in sync with triggers,
+# Postgres a generated tsvector column with a GIN index.
+# Not part of the mapped model; the migrations create the same objects.
+SQLITE_SEARCH_DDL = (
+    """CREATE VIRTUAL TABLE order_fts USING fts5(
+        name, description, content='order', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+    )""",
+    """CREATE TRIGGER order_fts_ai AFTER INSERT ON "order" BEGIN
+        INSERT INTO order_fts(rowid, name, description) VALUES (new.id, new.name, new.description);
+    END""",
+    """CREATE TRIGGER order_fts_ad AFTER DELETE ON "order" BEGIN
+        INSERT INTO order_fts(order_fts, rowid, name, description) VALUES ('delete', old.id, old.name, old.description);
+    END""",
+    """CREATE TRIGGER order_fts_au AFTER UPDATE OF name, description ON "order" BEGIN
+        INSERT INTO order_fts(order_fts, rowid, name, description) VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO order_fts(rowid, name, description) VALUES (new.id, new.name, new.description);
+    END""",
+)
+POSTGRES_SEARCH_DDL = (
+    """ALTER TABLE "order" ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(name, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(description, '')), 'B')
+    ) STORED""",
+    """CREATE INDEX ix_order_search_vector ON "order" USING gin (search_vector)""",
+)
+# Database objects of the search index, for Alembic autogenerate to leave alone
+SEARCH_OBJECT_NAMES = frozenset({
+    "order_fts", "order_fts_data", "order_fts_idx", "order_fts_docsize", "order_fts_config",
+    "search_vector", "ix_order_search_vector",
+})
+
+for statement in SQLITE_SEARCH_DDL:
+    event.listen(OrderModel.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+for statement in POSTGRES_SEARCH_DDL:
+    event.listen(OrderModel.__table__, "after_create", DDL(statement).execute_if(dialect="postgresql"))
+event.listen(OrderModel.__table__, "before_drop", DDL("DROP TABLE IF EXISTS order_fts").execute_if(dialect="sqlite"))
@@ -1,7 +1,9 @@
-from sqlalchemy import ForeignKey, UniqueConstraint
+from datetime import datetime
+from sqlalchemy import ForeignKey, Index, UniqueConstraint, column, nulls_first
 from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.sql.sqltypes import String
 
-from db.base import BaseModel
+from db.base import BaseModel, Timestamp
 
 class UserOrderModel(BaseModel):
     """Junction table to connect users with their created orders."""
@@ -17,6 +19,11 @@ class UserOrderModel(BaseModel):
     OrderId: Mapped[int] = mapped_column(
         ForeignKey("order.id", ondelete="CASCADE"), nullable=False
     )
+    # Copies of the order's listing sort columns, kept in sync by the services that write them,
+    # so that a user's listing walks one of the (UserId, sort column, OrderId) indexes below
+    orderCreatedAt: Mapped[datetime] = mapped_column(Timestamp, nullable=False)
+    orderName: Mapped[str] = mapped_column(String(length=200), nullable=False)
+    orderStatus: Mapped[str] = mapped_column(String(length=50), nullable=True)
 
     # Relationships
     user: Mapped["UserModel"] = relationship("UserModel", back_populates="user_orders")
@@ -24,4 +31,18 @@ class UserOrderModel(BaseModel):
 
     __table_args__ = (
         UniqueConstraint("UserId", "OrderId", name="uq_user_order"),
-    )
\ No newline at end of file
+        # ON DELETE CASCADE from order, and the owners of an order
+        Index("ix_user_orders_OrderId_UserId", "OrderId", "UserId"),
+        # Keyset order of the order listing, starting from the owner
+        Index("ix_user_orders_UserId_orderCreatedAt_OrderId", "UserId", "orderCreatedAt", "OrderId"),
+        Index("ix_user_orders_UserId_orderName_OrderId", "UserId", "orderName", "OrderId"),
+        # NULL statuses sort first: SQLite indexes already keep NULLs first, Postgres needs it spelled out
+        Index("ix_user_orders_UserId_orderStatus_OrderId", "UserId", "orderStatus", "OrderId").ddl_if(
+            callable_=lambda ddl, target, bind, **kw: kw["dialect"].name != "postgresql"
+        ),
+        Index(
+            "ix_user_orders_UserId_orderStatus_nulls_first_OrderId",
+            "UserId", nulls_first(column("orderStatus")), "OrderId",
+        ).ddl_if(dialect="postgresql"),
+    )
+
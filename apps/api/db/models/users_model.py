@@ -1,5 +1,6 @@
+from sqlalchemy import column
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy.sql.sqltypes import String, Boolean
+from sqlalchemy.sql.sqltypes import Integer, String, Boolean
 from typing import List, TYPE_CHECKING
 
 from db.base import BaseModel
@@ -19,6 +20,10 @@ class UserModel(BaseModel):
     email: Mapped[str] = mapped_column(String(length=200), nullable=False, unique=True)
     phone: Mapped[str] = mapped_column(String(length=20), nullable=True)
     isActive: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False)
+    # Row version, incremented by every UPDATE statement, see OrderModel.version
+    version: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=1, server_default="1", onupdate=column("version") + 1
+    )
     
     # Relationships
     user_orders: Mapped[List["UserOrderModel"]] = relationship(
@@ -0,0 +1,71 @@
+import itertools
+import time
+from typing import Hashable, List, Literal, Optional
+
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from app.helpers.cache_helper import TTLCache
+
+ReplicaStrategy = Literal["round_robin", "least_connections"]
+
+
+class ReadSessionRouter:
+    """
+    Creates read-only sessions on the primary's read engine or on one of its replicas.
+
+    Replicas are picked round-robin, or by the fewest connections in use. A caller that
+    wrote within the last `read_your_writes_window` seconds reads from the primary, so it
+    sees its own writes even while the replicas lag behind. Writes are recorded per
+    process: with several workers, a caller whose read lands on another worker is only
+    covered if the replicas lag less than the window.
+    """
+
+    def __init__(
+        self,
+        primary: AsyncEngine,
+        replicas: Optional[List[AsyncEngine]] = None,
+        strategy: ReplicaStrategy = "round_robin",
+        read_your_writes_window: float = 5.0,
+        max_writers: int = 4096,
+    ):
+        """
+        :param primary: engine for reads on the primary database.
+        :param replicas: engines of the read replicas, none means every read goes to the primary.
+        :param strategy: how a replica is picked: "round_robin" or "least_connections".
+        :param read_your_writes_window: seconds after a write during which the writer reads from the primary.
+        :param max_writers: maximum number of recent writers remembered.
+        """
+        self.primary = primary
+        self.replicas = replicas or []
+        self.strategy = strategy
+        self.read_your_writes_window = read_your_writes_window
+        self._session_factories = {
+            engine: async_sessionmaker(engine, expire_on_commit=False) for engine in [primary, *self.replicas]
+        }
+        self._next_replica = itertools.cycle(self.replicas)
+        self._recent_writers: TTLCache[Hashable, bool] = TTLCache(max_size=max_writers)
+
+    def __call__(self, key: Optional[Hashable] = None) -> AsyncSession:
+        """
+        New read-only session.
+        :param key: identifies the caller, e.g. its email, for read-your-writes.
+        """
+        return self._session_factories[self.engine_for(key)]()
+
+    def engine_for(self, key: Optional[Hashable] = None) -> AsyncEngine:
+        if not self.replicas or (key is not None and self._recent_writers.get(key)):
+            return self.primary
+        if self.strategy == "least_connections":
+            return min(self.replicas, key=self._connections_in_use)
+        return next(self._next_replica)
+
+    @staticmethod
+    def _connections_in_use(engine: AsyncEngine) -> int:
+        # Only queue pools count their connections; a StaticPool (in-memory SQLite) has just one
+        checkedout = getattr(engine.pool, "checkedout", None)
+        return checkedout() if checkedout is not None else 0
+
+    def record_write(self, key: Hashable) -> None:
+        """Send the caller's reads to the primary for the next `read_your_writes_window` seconds."""
+        if self.replicas:
+            self._recent_writers.set(key, True, expires_at=time.time() + self.read_your_writes_window)
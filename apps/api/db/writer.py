@@ -0,0 +1,128 @@
+import asyncio
+import contextvars
+import logging
+from typing import Any, Awaitable, Callable, List, Optional, Tuple, TypeVar
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from db.instrumentation import QueryStats, current_query_stats
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+WriteJob = Callable[[AsyncSession], Awaitable[T]]
+# A submitted job, the future of its result and the query stats of the request that submitted it
+QueuedJob = Tuple[WriteJob, asyncio.Future, Optional[QueryStats]]
+
+
+class SingleWriter:
+    """
+    Runs all write jobs of the process one at a time on a single connection, committing them in groups.
+
+    SQLite lets one connection write at a time; concurrent writers on separate connections
+    wait on each other through busy_timeout or fail with "database is locked". Here jobs are
+    queued instead, and one worker task runs them in arrival order. Each job runs in its own
+    SAVEPOINT, so a failing job is rolled back alone. Jobs that queue up while a group is being
+    written form the next group, which is committed with a single COMMIT: under load there is
+    one commit per group instead of one per write, and an idle writer commits right away.
+    The statements of a job are recorded in the query stats of the request that submitted it.
+    """
+
+    def __init__(self, session_factory: async_sessionmaker[AsyncSession], max_batch_size: int = 64):
+        """
+        :param session_factory: sessions on the connection that writes, one per group.
+        :param max_batch_size: maximum number of jobs committed together.
+        """
+        self.session_factory = session_factory
+        self.max_batch_size = max_batch_size
+        self._queue: "asyncio.Queue[QueuedJob]" = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+
+    async def submit(self, job: WriteJob[T]) -> T:
+        """
+        Run a write job and wait until its changes are committed.
+        :param job: coroutine function that writes through the session it is given; it must
+            neither commit nor roll back, and should flush so that errors surface in the job.
+        :return: the job's result; ORM objects in it are detached, with their loaded attributes.
+        """
+        if self._task is None or self._task.done():
+            # The task outlives the request that happens to start it, so it gets a context of its own
+            # instead of a copy of that request's (current_query_stats among others)
+            self._task = asyncio.create_task(self._run(), context=contextvars.Context())
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((job, future, current_query_stats.get()))
+        return await future
+
+    async def stop(self) -> None:
+        """Stop the worker task; the jobs it has not committed yet fail with RuntimeError."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        while not self._queue.empty():
+            self._fail([self._queue.get_nowait()], RuntimeError("writer stopped"))
+
+    async def _run(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.max_batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            try:
+                await self._write_batch(batch)
+            except asyncio.CancelledError:
+                self._fail(batch, RuntimeError("writer stopped"))
+                raise
+            except Exception as e:
+                # Only reached if the session itself fails, e.g. on connect
+                logger.exception("Write batch failed")
+                self._fail(batch, e)
+
+    @staticmethod
+    def _fail(batch: List[QueuedJob], error: BaseException) -> None:
+        for _, future, _ in batch:
+            if not future.done():
+                future.set_exception(error)
+
+    async def _write_batch(self, batch: List[QueuedJob]) -> None:
+        written: List[Tuple[asyncio.Future, Any]] = []
+        async with self.session_factory() as session:
+            for job, future, stats in batch:
+                if future.cancelled():
+                    continue
+                token = current_query_stats.set(stats)
+                try:
+                    async with session.begin_nested():
+                        result = await job(session)
+                except Exception as e:
+                    future.set_exception(e)
+                else:
+                    written.append((future, result))
+                finally:
+                    current_query_stats.reset(token)
+            try:
+                await session.commit()
+            except Exception as e:
+                await session.rollback()
+                for future, _ in written:
+                    if not future.done():
+                        future.set_exception(e)
+                return
+        for future, result in written:
+            if not future.done():
+                future.set_result(result)
+
+
+async def run_write(db_session: AsyncSession, job: WriteJob[T]) -> T:
+    """
+    Run a write job and commit it: through the session factory's SingleWriter if it has one
+    (SQLite profile, see setup_db), else directly on `db_session`.
+    """
+    writer: Optional[SingleWriter] = db_session.info.get("writer")
+    if writer is not None:
+        return await writer.submit(job)
+    result = await job(db_session)
+    await db_session.commit()
+    return result
@@ -2,7 +2,14 @@ from fastapi import FastAPI
 from contextlib import asynccontextmanager
 from collections.abc import AsyncGenerator
 
-from db.main import setup_db
+from app.helpers.auth_helper import jwks_verifier
+from app.helpers.logging_helper import setup_logging
+from app.services.carrier_client import NovaPoshtaClient
+from app.services.order_service import order_page_cache
+from app.services.tracking_service import TrackingRefresher
+from db.lease import DbLease
+from db.main import dispose_db, setup_db
+from settings import settings
 
 
 @asynccontextmanager
@@ -16,8 +23,29 @@ async def lifespan_setup(
     :param app: the fastAPI application.
     :return: function that actually performs actions.
     """
+    log_listener = setup_logging(settings.log_level.value, settings.log_debug_sample_rate)
     app.middleware_stack = None
     setup_db(app)
     app.middleware_stack = app.build_middleware_stack()
+    await jwks_verifier.start()
+    tracking_refresher = None
+    if settings.tracking_refresh_enabled:
+        tracking_refresher = TrackingRefresher(
+            app.state.db_session_factory,
+            NovaPoshtaClient(settings.np_api_url, settings.np_api_key),
+            batch_size=settings.tracking_batch_size,
+            concurrency=settings.tracking_concurrency,
+            rate_limit=settings.tracking_rate_limit,
+            interval=settings.tracking_refresh_interval,
+            # One pass at a time across all workers and instances
+            lease=DbLease(app.state.db_session_factory, "tracking_refresh"),
+            lease_ttl=settings.tracking_lease_ttl,
+        )
+        tracking_refresher.start()
     yield
-    await app.state.db_engine.dispose()
+    if tracking_refresher is not None:
+        await tracking_refresher.stop()
+    await jwks_verifier.stop()
+    await order_page_cache.close()
+    await dispose_db(app)
+    log_listener.stop()
@@ -1,7 +1,10 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
+from app.helpers.auth_helper import get_email_from_authorization
+from app.middleware import AdmissionController, AdmissionControlMiddleware, QueryStatsMiddleware
 from app.router import router as api_router
+from settings import settings
 from lifespan import lifespan_setup
 
 app = FastAPI(
@@ -11,6 +14,23 @@ app = FastAPI(
     lifespan=lifespan_setup
 )
 
+# Global in-flight limit with a bounded wait queue, and per-user rate limits; added before
+# CORS so that its 429/503 responses carry the CORS headers
+app.state.admission = AdmissionController(
+    max_in_flight=settings.admission_max_in_flight,
+    max_queue=settings.admission_max_queue,
+    queue_timeout=settings.admission_queue_timeout,
+    principal_rate=settings.admission_user_rate,
+    principal_burst=settings.admission_user_burst,
+)
+app.add_middleware(
+    AdmissionControlMiddleware,
+    controller=app.state.admission,
+    identify=get_email_from_authorization,
+    retry_after=settings.admission_retry_after,
+    exempt_paths=("/health",),
+)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -20,6 +40,12 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-request SQL statement count and DB time, as a Server-Timing header and a log line
+app.add_middleware(
+    QueryStatsMiddleware,
+    n_plus_one_threshold=settings.n_plus_one_threshold if settings.debug else 0,
+)
+
 # Include API routers
 app.include_router(api_router, prefix="/api/v1", tags=["APIv1"])
 
@@ -35,5 +61,5 @@ async def health_check():
 
 
 if __name__ == "__main__":
-    import uvicorn
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
+    from server import serve
+    serve()
@@ -0,0 +1,64 @@
+import importlib.util
+import logging
+import os
+
+import uvicorn
+
+from settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+def worker_count() -> int:
+    """Number of worker processes to start: `workers_count`, or one per CPU core when it is 0."""
+    if settings.workers_count > 0:
+        return settings.workers_count
+    return os.cpu_count() or 1
+
+
+def serve() -> None:
+    """
+    Run the API with uvicorn, configured from the settings.
+
+    Outside of debug mode in the dev environment, `worker_count()` worker processes are
+    started by a supervisor and accept connections from one shared listening socket;
+    in debug mode in dev a single process reloads on code changes. uvloop and httptools
+    are used when they are installed (uvicorn[standard]). On SIGTERM or SIGINT every
+    worker stops accepting connections, waits up to `graceful_shutdown_timeout` seconds
+    for the requests in flight, then runs the lifespan shutdown.
+    """
+    logging.basicConfig(level=settings.log_level.value, format="%(levelname)s:     %(message)s")
+    reload = settings.debug and settings.environment == "dev"
+    workers = 1 if reload else worker_count()
+    loop = "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+    http = "httptools" if importlib.util.find_spec("httptools") else "h11"
+    # The worker processes load the settings again from the environment: hand them the resolved
+    # count, which the order page cache depends on
+    os.environ["APP_WORKERS_COUNT"] = str(workers)
+    if workers > 1 and settings.order_page_cache_ttl > 0 and not settings.order_page_cache_url:
+        logger.warning(
+            "The order page cache is disabled: it is per process without APP_ORDER_PAGE_CACHE_URL, "
+            "set it to a Redis server shared by the %d workers to enable the cache", workers,
+        )
+    logger.info("Serving on %s:%d with %d worker(s), %s event loop, %s parser%s",
+                settings.host, settings.port, workers, loop, http, ", reloading on changes" if reload else "")
+
+    uvicorn.run(
+        "main:app",
+        host=settings.host,
+        port=settings.port,
+        workers=workers,
+        reload=reload,
+        loop=loop,
+        http=http,
+        backlog=settings.backlog,
+        timeout_keep_alive=settings.keep_alive_timeout,
+        limit_concurrency=settings.limit_concurrency or None,
+        timeout_graceful_shutdown=settings.graceful_shutdown_timeout,
+        # QueryStatsMiddleware already logs every request, with its status and timings
+        access_log=False,
+    )
+
+
+if __name__ == "__main__":
+    serve()
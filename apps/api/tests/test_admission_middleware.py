@@ -0,0 +1,155 @@
+import asyncio
+from typing import Optional
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app.middleware import AdmissionController, AdmissionControlMiddleware
+
+
+def create_app(controller: AdmissionController, identify=None) -> FastAPI:
+    """App whose /slow requests are held until `app.state.release` is set."""
+    app = FastAPI()
+    app.state.release = asyncio.Event()
+    app.state.started = 0
+
+    @app.get("/slow")
+    async def slow():
+        app.state.started += 1
+        await app.state.release.wait()
+        return {"ok": True}
+
+    @app.get("/fast")
+    async def fast():
+        return {"ok": True}
+
+    @app.get("/health")
+    async def health():
+        return {"status": "ok"}
+
+    app.add_middleware(
+        AdmissionControlMiddleware, controller=controller, identify=identify, retry_after=2, exempt_paths=("/health",),
+    )
+    return app
+
+
+def client_of(app: FastAPI) -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+
+async def wait_until(condition) -> None:
+    for _ in range(100):
+        if condition():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("condition not reached")
+
+
+@pytest.mark.asyncio
+async def test_requests_under_the_limit_are_admitted():
+    controller = AdmissionController(max_in_flight=2, max_queue=0)
+    async with client_of(create_app(controller)) as client:
+        responses = await asyncio.gather(*(client.get("/fast") for _ in range(5)))
+
+    assert [response.status_code for response in responses] == [200] * 5
+    assert controller.in_flight == 0
+    assert controller.status()["admitted"] == 5
+
+
+@pytest.mark.asyncio
+async def test_full_queue_sheds_with_503():
+    controller = AdmissionController(max_in_flight=1, max_queue=1, queue_timeout=5)
+    app = create_app(controller)
+    async with client_of(app) as client:
+        running = asyncio.create_task(client.get("/slow"))
+        await wait_until(lambda: app.state.started == 1)
+        queued = asyncio.create_task(client.get("/slow"))
+        await wait_until(lambda: controller.status()["queueDepth"] == 1)
+
+        shed = await client.get("/slow")
+        assert shed.status_code == 503
+        assert shed.headers["retry-after"] == "2"
+        assert shed.json() == {"detail": "Server busy, retry later"}
+
+        # The queued request gets the slot once the running one is done
+        app.state.release.set()
+        assert (await running).status_code == 200
+        assert (await queued).status_code == 200
+
+    status = controller.status()
+    assert (status["admitted"], status["queued"], status["rejectedQueueFull"]) == (2, 1, 1)
+    assert controller.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_request_waiting_too_long_gets_503():
+    controller = AdmissionController(max_in_flight=1, max_queue=4, queue_timeout=0.05)
+    app = create_app(controller)
+    async with client_of(app) as client:
+        running = asyncio.create_task(client.get("/slow"))
+        await wait_until(lambda: app.state.started == 1)
+
+        timed_out = await client.get("/fast")
+        assert timed_out.status_code == 503
+        assert timed_out.headers["retry-after"] == "2"
+
+        app.state.release.set()
+        assert (await running).status_code == 200
+
+    assert controller.status()["rejectedTimeout"] == 1
+    assert controller.status()["queueDepth"] == 0
+    assert controller.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_exempt_paths_pass_when_full():
+    controller = AdmissionController(max_in_flight=1, max_queue=0)
+    app = create_app(controller)
+    async with client_of(app) as client:
+        running = asyncio.create_task(client.get("/slow"))
+        await wait_until(lambda: app.state.started == 1)
+
+        assert (await client.get("/fast")).status_code == 503
+        assert (await client.get("/health")).status_code == 200
+
+        app.state.release.set()
+        await running
+
+
+@pytest.mark.asyncio
+async def test_principal_over_its_rate_gets_429():
+    async def identify(authorization: Optional[str]) -> Optional[str]:
+        return authorization
+
+    controller = AdmissionController(principal_rate=0.5, principal_burst=2)
+    async with client_of(create_app(controller, identify)) as client:
+        statuses = [(await client.get("/fast", headers={"Authorization": "alice"})).status_code for _ in range(3)]
+        limited = await client.get("/fast", headers={"Authorization": "alice"})
+        other = await client.get("/fast", headers={"Authorization": "bob"})
+        anonymous = [(await client.get("/fast")).status_code for _ in range(3)]
+
+    assert statuses == [200, 200, 429]
+    assert limited.status_code == 429
+    # A token comes back every 2 seconds
+    assert limited.headers["retry-after"] == "2"
+    assert other.status_code == 200
+    assert anonymous == [200] * 3
+    assert controller.status()["rejectedRateLimited"] == 2
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_keep_a_slot():
+    controller = AdmissionController(max_in_flight=1, max_queue=4, queue_timeout=5)
+    assert await controller.acquire()
+    waiting = asyncio.create_task(controller.acquire())
+    await wait_until(lambda: controller.status()["queueDepth"] == 1)
+
+    waiting.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiting
+    controller.release()
+
+    assert controller.in_flight == 0
+    assert controller.status()["queueDepth"] == 0
+    assert await controller.acquire()
@@ -0,0 +1,187 @@
+import asyncio
+import base64
+import json
+import time
+
+import pytest
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.asymmetric import padding, rsa
+
+from app.helpers import jwks_helper
+from app.helpers.jwks_helper import JWKSVerifier, StaticJWKSSource
+
+
+def b64url(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).decode("ascii").rstrip("=")
+
+
+def int_b64url(value: int) -> str:
+    return b64url(value.to_bytes((value.bit_length() + 7) // 8, "big"))
+
+
+def make_jwk(key, kid: str) -> dict:
+    numbers = key.public_key().public_numbers()
+    return {"kty": "RSA", "use": "sig", "alg": "RS256", "kid": kid, "n": int_b64url(numbers.n), "e": int_b64url(numbers.e)}
+
+
+def make_token(key, kid: str, alg: str = "RS256", **claims) -> str:
+    """RS256 token signed with `key`; claims set to None are left out."""
+    claims = {"sub": "1", "email": "user@example.com", "exp": time.time() + 300, **claims}
+    header = b64url(json.dumps({"alg": alg, "kid": kid, "typ": "JWT"}).encode("utf-8"))
+    payload = b64url(json.dumps({name: value for name, value in claims.items() if value is not None}).encode("utf-8"))
+    signature = key.sign(f"{header}.{payload}".encode("ascii"), padding.PKCS1v15(), hashes.SHA256())
+    return f"{header}.{payload}.{b64url(signature)}"
+
+
+@pytest.fixture(scope="module")
+def keys():
+    return {kid: rsa.generate_private_key(public_exponent=65537, key_size=2048) for kid in ("old", "new")}
+
+
+@pytest.fixture
+def source(keys):
+    return StaticJWKSSource({"keys": [make_jwk(keys["old"], "old")]})
+
+
+@pytest.mark.asyncio
+async def test_verify_returns_claims(keys, source):
+    verifier = JWKSVerifier(source, audience="client-id", issuers=["https://accounts.google.com"])
+    await verifier.refresh()
+
+    claims = verifier.verify(make_token(keys["old"], "old", aud="client-id", iss="https://accounts.google.com"))
+
+    assert claims["email"] == "user@example.com"
+
+
+@pytest.mark.asyncio
+async def test_verify_rejects_expired_token(keys, source):
+    verifier = JWKSVerifier(source)
+    await verifier.refresh()
+
+    with pytest.raises(ValueError, match="expired"):
+        verifier.verify(make_token(keys["old"], "old", exp=time.time() - 10))
+
+
+@pytest.mark.asyncio
+async def test_verify_accepts_expired_token_within_leeway(keys, source):
+    verifier = JWKSVerifier(source, leeway=60)
+    await verifier.refresh()
+
+    assert verifier.verify(make_token(keys["old"], "old", exp=time.time() - 10))["sub"] == "1"
+
+
+@pytest.mark.asyncio
+async def test_verify_rejects_token_without_exp(keys, source):
+    verifier = JWKSVerifier(source)
+    await verifier.refresh()
+
+    with pytest.raises(ValueError, match="no exp"):
+        verifier.verify(make_token(keys["old"], "old", exp=None))
+
+
+@pytest.mark.asyncio
+async def test_verify_rejects_token_not_yet_valid(keys, source):
+    verifier = JWKSVerifier(source)
+    await verifier.refresh()
+
+    with pytest.raises(ValueError, match="not yet valid"):
+        verifier.verify(make_token(keys["old"], "old", nbf=time.time() + 60))
+
+
+@pytest.mark.asyncio
+async def test_verify_rejects_wrong_audience_and_issuer(keys, source):
+    verifier = JWKSVerifier(source, audience="client-id", issuers=["https://accounts.google.com"])
+    await verifier.refresh()
+
+    with pytest.raises(ValueError, match="audience"):
+        verifier.verify(make_token(keys["old"], "old", aud="other", iss="https://accounts.google.com"))
+    with pytest.raises(ValueError, match="issuer"):
+        verifier.verify(make_token(keys["old"], "old", aud="client-id", iss="https://evil.example.com"))
+
+
+@pytest.mark.asyncio
+async def test_verify_rejects_bad_signature(keys, source):
+    verifier = JWKSVerifier(source)
+    await verifier.refresh()
+    # Signed by another key, but claiming the known kid
+    token = make_token(keys["new"], "old")
+
+    with pytest.raises(ValueError, match="signature"):
+        verifier.verify(token)
+
+
+@pytest.mark.asyncio
+async def test_verify_rejects_tampered_payload(keys, source):
+    verifier = JWKSVerifier(source)
+    await verifier.refresh()
+    header, _, signature = make_token(keys["old"], "old").split(".")
+    payload = b64url(json.dumps({"sub": "2", "exp": time.time() + 300}).encode("utf-8"))
+
+    with pytest.raises(ValueError, match="signature"):
+        verifier.verify(f"{header}.{payload}.{signature}")
+
+
+@pytest.mark.asyncio
+async def test_verify_rejects_other_algorithms_and_malformed_tokens(keys, source):
+    verifier = JWKSVerifier(source)
+    await verifier.refresh()
+
+    with pytest.raises(ValueError, match="algorithm"):
+        verifier.verify(make_token(keys["old"], "old", alg="none"))
+    with pytest.raises(ValueError, match="Malformed"):
+        verifier.verify("not-a-jwt")
+
+
+@pytest.mark.asyncio
+async def test_refresh_picks_up_rotated_key(keys, source):
+    verifier = JWKSVerifier(source)
+    await verifier.refresh()
+    token = make_token(keys["new"], "new")
+
+    with pytest.raises(ValueError, match="Unknown token signing key"):
+        verifier.verify(token)
+
+    # The provider publishes the new key next to the old one, then drops the old one
+    source.jwks = {"keys": [make_jwk(keys["old"], "old"), make_jwk(keys["new"], "new")]}
+    await verifier.refresh()
+    assert verifier.verify(token)["sub"] == "1"
+    assert verifier.verify(make_token(keys["old"], "old"))["sub"] == "1"
+
+    source.jwks = {"keys": [make_jwk(keys["new"], "new")]}
+    await verifier.refresh()
+    with pytest.raises(ValueError, match="Unknown token signing key"):
+        verifier.verify(make_token(keys["old"], "old"))
+
+
+@pytest.mark.asyncio
+async def test_unknown_kid_triggers_background_refresh(keys, source, monkeypatch):
+    monkeypatch.setattr(jwks_helper, "MIN_REFRESH_INTERVAL", 0)
+    verifier = JWKSVerifier(source, refresh_interval=3600)
+    await verifier.start()
+    try:
+        source.jwks = {"keys": [make_jwk(keys["new"], "new")]}
+        token = make_token(keys["new"], "new")
+        with pytest.raises(ValueError, match="Unknown token signing key"):
+            verifier.verify(token)
+
+        for _ in range(50):
+            await asyncio.sleep(0.01)
+            if "new" in verifier._keys:
+                break
+        assert verifier.verify(token)["sub"] == "1"
+    finally:
+        await verifier.stop()
+
+
+@pytest.mark.asyncio
+async def test_refresh_skips_non_signing_and_non_rsa_keys(keys):
+    jwks = {"keys": [
+        {**make_jwk(keys["old"], "enc"), "use": "enc"},
+        {**make_jwk(keys["old"], "ps"), "alg": "PS256"},
+        {"kty": "EC", "kid": "ec", "crv": "P-256", "x": "", "y": ""},
+        make_jwk(keys["new"], "new"),
+    ]}
+    verifier = JWKSVerifier(StaticJWKSSource(jwks))
+    await verifier.refresh()
+
+    assert set(verifier._keys) == {"new"}
@@ -0,0 +1,129 @@
+import base64
+import json
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+
+from app.helpers.pagination_helper import decode_cursor, encode_cursor, next_cursor
+from app.models.order_schema import OrderGetParamsSchema
+from app.services.order_service import OrderService
+from db.base import Base
+from db.models import OrderModel, UserModel, UserOrderModel
+
+CREATED_AT = UserOrderModel.__table__.c.orderCreatedAt
+NAME = UserOrderModel.__table__.c.orderName
+STATUS = UserOrderModel.__table__.c.orderStatus
+
+
+def payload_of(cursor: str) -> dict:
+    return json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+
+
+def cursor_of(payload: dict) -> str:
+    return base64.urlsafe_b64encode(json.dumps(payload).encode("utf-8")).decode("ascii").rstrip("=")
+
+
+@pytest.mark.parametrize("column, sort_by, value", [
+    (CREATED_AT, "createdAt", datetime(2025, 1, 2, 3, 4, 5)),
+    (NAME, "name", "phone case"),
+    (STATUS, "status", None),
+])
+def test_cursor_round_trip(column, sort_by, value):
+    cursor = encode_cursor(sort_by, "desc", value, 42)
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor, column, sort_by, "desc") == (value, 42)
+
+
+def test_decode_rejects_cursor_of_another_sort():
+    cursor = encode_cursor("name", "asc", "phone", 1)
+
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(cursor, CREATED_AT, "createdAt", "asc")
+    assert error.value.status_code == 400
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(cursor, NAME, "name", "desc")
+    assert error.value.status_code == 400
+
+
+@pytest.mark.parametrize("cursor", [
+    "not base64!",
+    base64.urlsafe_b64encode(b"not json").decode("ascii"),
+    cursor_of({"k": "name", "o": "asc", "v": "phone"}),
+    cursor_of({"k": "name", "o": "asc", "v": "phone", "id": "one"}),
+    cursor_of(["name", "asc", "phone", 1]),
+])
+def test_decode_rejects_malformed_cursor(cursor):
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(cursor, NAME, "name", "asc")
+    assert error.value.status_code == 400
+    assert error.value.detail == "Invalid cursor"
+
+
+def test_decode_rejects_tampered_datetime():
+    payload = payload_of(encode_cursor("createdAt", "asc", datetime(2025, 1, 1), 7))
+    payload["v"] = "yesterday"
+
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(cursor_of(payload), CREATED_AT, "createdAt", "asc")
+    assert error.value.status_code == 400
+
+
+def test_next_cursor_points_after_last_row_of_page():
+    rows = [SimpleNamespace(id=order_id, name=f"order {order_id}") for order_id in (3, 5, 8)]
+
+    cursor = next_cursor(rows, 2, "name", "asc")
+
+    assert decode_cursor(cursor, NAME, "name", "asc") == ("order 5", 5)
+    assert next_cursor(rows[:2], 2, "name", "asc") is None
+    assert next_cursor(rows, None, "name", "asc") is None
+
+
+@pytest.fixture(scope="module")
+def seeded_session():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    statuses = [None, "created", "arrived"]
+    with engine.begin() as conn:
+        conn.execute(insert(UserModel.__table__), [{"id": 1, "email": "a@example.com"}, {"id": 2, "email": "b@example.com"}])
+        orders = [
+            {"id": order_id, "name": f"order {order_id % 4}", "externalId": str(order_id), "status": statuses[order_id % 3],
+             # Several orders share a createdAt, name and status, so the id has to break ties
+             "createdAt": datetime(2025, 1, 1) + timedelta(seconds=order_id // 3)}
+            for order_id in range(1, 26)
+        ]
+        conn.execute(insert(OrderModel.__table__), orders)
+        conn.execute(insert(UserOrderModel.__table__), [
+            {"UserId": 1 if order["id"] % 5 else 2, "OrderId": order["id"], "orderCreatedAt": order["createdAt"],
+             "orderName": order["name"], "orderStatus": order["status"]}
+            for order in orders
+        ])
+    with Session(engine) as session:
+        yield session
+
+
+@pytest.mark.parametrize("sort_by", ["createdAt", "name", "status"])
+@pytest.mark.parametrize("order", ["asc", "desc"])
+def test_cursor_pages_cover_the_listing_once(seeded_session, sort_by, order):
+    user = SimpleNamespace(id=1)
+    owned = seeded_session.scalars(OrderService.list_orders_query(user, OrderGetParamsSchema(limit=100))).all()
+    # NULLs first in ascending order, last in descending order, ties broken by id
+    expected = sorted(
+        owned, key=lambda row: (getattr(row, sort_by) is not None, getattr(row, sort_by) or "", row.id),
+        reverse=order == "desc",
+    )
+    pages, cursor = [], None
+    while True:
+        params = OrderGetParamsSchema(sortBy=sort_by, order=order, limit=3, cursor=cursor)
+        rows = seeded_session.scalars(OrderService.list_orders_query(user, params)).all()
+        pages.append([row.id for row in rows[:3]])
+        cursor = next_cursor(rows, 3, sort_by, order)
+        if cursor is None:
+            break
+
+    assert len(owned) == 20
+    assert [order_id for page in pages for order_id in page] == [row.id for row in expected]
@@ -0,0 +1,143 @@
+import asyncio
+
+import httpx
+import pytest
+import pytest_asyncio
+from fastapi import Depends, FastAPI, Header, Request
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from db.main import configure_sqlite, get_db_session, get_readonly_db_session
+from db.replicas import ReadSessionRouter
+
+
+async def create_database(path, name: str, query_only: bool = False):
+    """Engine on an SQLite file whose `source` table tells which database a read came from."""
+    seed = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async with seed.begin() as conn:
+        await conn.execute(text("CREATE TABLE source (name TEXT NOT NULL)"))
+        await conn.execute(text("INSERT INTO source (name) VALUES (:name)"), {"name": name})
+    await seed.dispose()
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    configure_sqlite(engine, query_only=query_only)
+    return engine
+
+
+@pytest_asyncio.fixture
+async def primary(tmp_path):
+    engine = await create_database(tmp_path / "primary.db", "primary")
+    yield engine
+    await engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def replica(tmp_path):
+    """Replica on a file of its own: it never sees the primary's writes, like a replica lagging behind."""
+    engine = await create_database(tmp_path / "replica.db", "replica", query_only=True)
+    yield engine
+    await engine.dispose()
+
+
+async def read_source(session: AsyncSession) -> list:
+    async with session:
+        return (await session.scalars(text("SELECT name FROM source ORDER BY rowid"))).all()
+
+
+@pytest.mark.asyncio
+async def test_reads_go_to_primary_without_replicas(primary):
+    router = ReadSessionRouter(primary)
+    router.record_write("user@example.com")
+
+    assert router.engine_for() is primary
+    assert await read_source(router()) == ["primary"]
+
+
+@pytest.mark.asyncio
+async def test_reads_go_to_replica(primary, replica):
+    router = ReadSessionRouter(primary, [replica])
+
+    assert await read_source(router()) == ["replica"]
+    assert await read_source(router("user@example.com")) == ["replica"]
+
+
+@pytest.mark.asyncio
+async def test_replica_refuses_writes(replica):
+    async with async_sessionmaker(replica)() as session:
+        with pytest.raises(OperationalError, match="readonly"):
+            await session.execute(text("INSERT INTO source (name) VALUES ('write')"))
+
+
+@pytest.mark.asyncio
+async def test_round_robin_cycles_through_replicas(primary, replica, tmp_path):
+    second = await create_database(tmp_path / "replica2.db", "replica2", query_only=True)
+    try:
+        router = ReadSessionRouter(primary, [replica, second])
+
+        assert [await read_source(router()) for _ in range(4)] == [["replica"], ["replica2"], ["replica"], ["replica2"]]
+    finally:
+        await second.dispose()
+
+
+@pytest.mark.asyncio
+async def test_least_connections_picks_least_busy_replica(primary, replica, tmp_path):
+    second = await create_database(tmp_path / "replica2.db", "replica2", query_only=True)
+    try:
+        router = ReadSessionRouter(primary, [replica, second], strategy="least_connections")
+        async with replica.connect() as busy:
+            await busy.execute(text("SELECT 1"))
+            assert router.engine_for() is second
+        async with second.connect() as busy:
+            await busy.execute(text("SELECT 1"))
+            assert router.engine_for() is replica
+    finally:
+        await second.dispose()
+
+
+@pytest.mark.asyncio
+async def test_writer_reads_from_primary_within_window(primary, replica):
+    router = ReadSessionRouter(primary, [replica], read_your_writes_window=0.2)
+    router.record_write("writer@example.com")
+
+    assert await read_source(router("writer@example.com")) == ["primary"]
+    assert await read_source(router("other@example.com")) == ["replica"]
+    assert await read_source(router()) == ["replica"]
+
+    await asyncio.sleep(0.3)
+    assert await read_source(router("writer@example.com")) == ["replica"]
+
+
+def create_app(primary, replica) -> FastAPI:
+    """App with the session dependencies of db.main, keyed on the X-User header like get_session_user_email."""
+    app = FastAPI()
+    app.state.db_session_factory = async_sessionmaker(primary, expire_on_commit=False)
+    app.state.db_readonly_session_factory = ReadSessionRouter(primary, [replica])
+
+    async def session_user(request: Request, x_user: str = Header()) -> str:
+        request.state.db_session_key = x_user
+        return x_user
+
+    @app.post("/sources")
+    async def add_source(name: str, user: str = Depends(session_user), session: AsyncSession = Depends(get_db_session)):
+        await session.execute(text("INSERT INTO source (name) VALUES (:name)"), {"name": name})
+
+    @app.get("/sources")
+    async def list_sources(user: str = Depends(session_user), session: AsyncSession = Depends(get_readonly_db_session)):
+        return (await session.scalars(text("SELECT name FROM source ORDER BY rowid"))).all()
+
+    return app
+
+
+@pytest.mark.asyncio
+async def test_requests_read_their_own_writes(primary, replica):
+    app = create_app(primary, replica)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        assert (await client.get("/sources", headers={"X-User": "writer"})).json() == ["replica"]
+
+        response = await client.post("/sources", params={"name": "written"}, headers={"X-User": "writer"})
+        assert response.status_code == 200
+
+        # The write is committed on the primary, which the writer now reads from
+        assert (await client.get("/sources", headers={"X-User": "writer"})).json() == ["primary", "written"]
+        assert (await client.get("/sources", headers={"X-User": "other"})).json() == ["replica"]
@@ -0,0 +1,152 @@
+import asyncio
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import event, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from db.instrumentation import QueryStats, current_query_stats, instrument_engine
+from db.main import configure_sqlite
+from db.writer import SingleWriter, run_write
+
+
+@pytest_asyncio.fixture
+async def engine(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'writer.db'}")
+    configure_sqlite(engine, begin="BEGIN IMMEDIATE")
+    instrument_engine(engine)
+    async with engine.begin() as conn:
+        await conn.execute(text("CREATE TABLE item (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE)"))
+    yield engine
+    await engine.dispose()
+
+
+@pytest.fixture
+def commits(engine):
+    """Number of COMMITs on the engine from now on."""
+    counter = {"count": 0}
+
+    @event.listens_for(engine.sync_engine, "commit")
+    def on_commit(conn):
+        counter["count"] += 1
+
+    return counter
+
+
+@pytest_asyncio.fixture
+async def writer(engine):
+    writer = SingleWriter(async_sessionmaker(engine, expire_on_commit=False), max_batch_size=4)
+    yield writer
+    await writer.stop()
+
+
+def insert_item(name: str, hold: asyncio.Event = None):
+    async def job(session: AsyncSession) -> str:
+        if hold is not None:
+            await hold.wait()
+        await session.execute(text("INSERT INTO item (name) VALUES (:name)"), {"name": name})
+        return name
+    return job
+
+
+async def item_names(engine):
+    async with engine.connect() as conn:
+        return set((await conn.scalars(text("SELECT name FROM item"))).all())
+
+
+@pytest.mark.asyncio
+async def test_idle_writer_commits_each_job_right_away(engine, writer, commits):
+    assert await writer.submit(insert_item("a")) == "a"
+    assert await writer.submit(insert_item("b")) == "b"
+
+    assert commits["count"] == 2
+    assert await item_names(engine) == {"a", "b"}
+
+
+@pytest.mark.asyncio
+async def test_jobs_queued_during_a_write_are_committed_together(engine, writer, commits):
+    hold = asyncio.Event()
+    first = asyncio.create_task(writer.submit(insert_item("first", hold)))
+    await asyncio.sleep(0.05)
+    # Queued while the first job holds the writer
+    queued = [asyncio.create_task(writer.submit(insert_item(f"queued{n}"))) for n in range(6)]
+    await asyncio.sleep(0.05)
+    hold.set()
+
+    assert await first == "first"
+    assert await asyncio.gather(*queued) == [f"queued{n}" for n in range(6)]
+    # One group for the first job, then groups of at most max_batch_size
+    assert commits["count"] == 3
+    assert await item_names(engine) == {"first"} | {f"queued{n}" for n in range(6)}
+
+
+@pytest.mark.asyncio
+async def test_failing_job_is_rolled_back_alone(engine, writer):
+    hold = asyncio.Event()
+    blocker = asyncio.create_task(writer.submit(insert_item("blocker", hold)))
+    await asyncio.sleep(0.05)
+
+    async def half_written(session: AsyncSession) -> None:
+        await session.execute(text("INSERT INTO item (name) VALUES ('partial')"))
+        await session.execute(text("INSERT INTO item (name) VALUES ('blocker')"))
+
+    async def failing(session: AsyncSession) -> None:
+        raise LookupError("not there")
+
+    results = [
+        asyncio.create_task(writer.submit(insert_item("before"))),
+        asyncio.create_task(writer.submit(half_written)),
+        asyncio.create_task(writer.submit(failing)),
+        asyncio.create_task(writer.submit(insert_item("after"))),
+    ]
+    await asyncio.sleep(0.05)
+    hold.set()
+    await blocker
+    outcomes = await asyncio.gather(*results, return_exceptions=True)
+
+    assert outcomes[0] == "before"
+    assert isinstance(outcomes[1], IntegrityError)
+    assert isinstance(outcomes[2], LookupError)
+    assert outcomes[3] == "after"
+    assert await item_names(engine) == {"blocker", "before", "after"}
+
+
+@pytest.mark.asyncio
+async def test_stop_fails_queued_jobs(writer):
+    hold = asyncio.Event()
+    running = asyncio.create_task(writer.submit(insert_item("running", hold)))
+    await asyncio.sleep(0.05)
+    queued = asyncio.create_task(writer.submit(insert_item("queued")))
+    await asyncio.sleep(0.05)
+
+    await writer.stop()
+
+    for task in (running, queued):
+        with pytest.raises(RuntimeError, match="writer stopped"):
+            await task
+
+
+@pytest.mark.asyncio
+async def test_statements_are_counted_on_the_submitting_request(writer):
+    async def request(name: str) -> QueryStats:
+        stats = QueryStats()
+        current_query_stats.set(stats)
+        await writer.submit(insert_item(name))
+        return stats
+
+    # Each request runs in a task of its own, with its own context, as under the ASGI server
+    first = await asyncio.create_task(request("a"))
+    second = await asyncio.create_task(request("b"))
+
+    # SAVEPOINT, INSERT, RELEASE (and BEGIN IMMEDIATE for the first write)
+    assert first.count >= 3
+    assert second.count >= 3
+
+
+@pytest.mark.asyncio
+async def test_run_write_commits_on_the_session_without_a_writer(engine):
+    async with async_sessionmaker(engine)() as session:
+        assert await run_write(session, insert_item("direct")) == "direct"
+
+    assert await item_names(engine) == {"direct"}